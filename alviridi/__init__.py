@@ -0,0 +1,7 @@
+# Data and rendering helpers for the Alviridi dashboard (app.py).
+import os
+
+# Charts are only ever drawn off-screen. Fixing the backend before anything
+# imports matplotlib spares pyplot (pulled in by seaborn) its search for a
+# GUI toolkit, here and in the render workers, which inherit the setting.
+os.environ.setdefault('MPLBACKEND', 'Agg')
@@ -0,0 +1,219 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from alviridi.coalesce import SingleFlight
+from alviridi.index import filter_key
+from alviridi.instrument import timed
+from alviridi.metrics import Ratio, apply_metrics
+from alviridi.schema import plain_categories
+
+SCOPE_COLUMNS = (
+    'Scope 1 Emissions (tons of CO2e)',
+    'Scope 2 Emissions (tons of CO2e)',
+    'Scope 3 Emissions (tons of CO2e)',
+)
+
+ROWS = 'Rows'
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    """A declared roll-up: ``func`` of ``measures`` grouped by ``keys``.
+
+    ``func`` is 'sum', 'count' or 'mean'. Rows with a missing value in any
+    ``notna`` column are excluded. With no keys, the result is a dict of one
+    value per measure; otherwise a frame shaped like
+    ``groupby(keys)[measures].agg(func).reset_index()``. ``metrics`` are
+    (name, metric) pairs (alviridi.metrics) added to the result, computed
+    from the aggregated measures.
+    """
+    keys: tuple
+    measures: tuple
+    func: str = 'sum'
+    notna: tuple = ()
+    metrics: tuple = ()
+
+
+# Every roll-up the dashboard draws, computed together once per filter state.
+AGGREGATIONS = {
+    'totals': Aggregation((), (
+        'Fund Size ($M)', 'Investment ($M)', 'Total Capital Committed ($B)', 'Fund Investments',
+        'Country Capital Catalyzed ($M)', 'Theme Capital Catalyzed ($M)',
+    )),
+    'scope_totals': Aggregation((), SCOPE_COLUMNS),
+    'country_capital': Aggregation(('Country',), ('Country Capital Catalyzed ($M)',)),
+    'country_investment': Aggregation(('Country',), ('Investment ($M)',)),
+    'country_deals': Aggregation(('Country',), ('Global South Deals Funded',)),
+    'country_emissions': Aggregation(('Country',), ('Total Emissions by Fund (tons of CO2e)',)),
+    'country_scope_emissions': Aggregation(('Country',), SCOPE_COLUMNS),
+    'theme_capital': Aggregation(('Theme',), ('Theme Capital Catalyzed ($M)',)),
+    'theme_emissions': Aggregation(('Theme',), ('Total Emissions by Fund (tons of CO2e)',)),
+    'global_south_theme_capital': Aggregation(
+        ('Theme',), ('Theme Capital Catalyzed ($M)',), notna=('Global South Countries Supported',),
+    ),
+    'global_south_deals': Aggregation(('Global South Countries Supported',), ('Global South Deals Funded',)),
+    'global_south_theme': Aggregation(
+        ('Global South Countries Supported', 'Theme'), ('Country Capital Catalyzed ($M)',),
+    ),
+    'country_theme_capital': Aggregation(('Country', 'Theme'), ('Theme Capital Catalyzed ($M)',)),
+    'fund_emissions': Aggregation(('Fund',), ('Total Emissions by Fund (tons of CO2e)',)),
+    'fund_performance': Aggregation(('Fund',), (
+        'Investment ($M)', 'Fund Size ($M)', 'Total Emissions by Fund (tons of CO2e)',
+    ), metrics=(
+        ('Utilization Ratio', Ratio('Investment ($M)', 'Fund Size ($M)', dtype='float64')),
+        ('Emissions per Investment', Ratio('Total Emissions by Fund (tons of CO2e)', 'Investment ($M)', dtype='float64')),
+    )),
+    'fund_theme_capital': Aggregation(('Fund', 'Theme'), ('Theme Capital Catalyzed ($M)',)),
+    'fund_theme_emissions': Aggregation(('Fund', 'Theme'), ('Total Emissions by Fund (tons of CO2e)',)),
+}
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def partial_aggregate(frame, keys, measures):
+    """Sums and row counts of ``measures`` per distinct combination of ``keys``.
+
+    This is the only pass over the rows; every Aggregation over a subset of
+    ``keys`` is rolled up from it. Missing key values are kept as their own
+    group so totals still include those rows. Float measures are summed as
+    float64: float32 sums drift by whole units past a few million rows.
+    """
+    wide = {measure: 'float64' for measure in measures if frame[measure].dtype == 'float32'}
+    if wide:
+        frame = frame.astype(wide)
+    grouped = frame.groupby(keys, observed=True, dropna=False, sort=False)
+    partial = grouped[measures].sum()
+    partial[ROWS] = grouped.size()
+    return plain_categories(partial.reset_index())
+
+
+def roll_up(partial, aggregation):
+    result = _roll_up(partial, aggregation)
+    return apply_metrics(result, dict(aggregation.metrics)) if aggregation.metrics else result
+
+
+def _roll_up(partial, aggregation):
+    rows = partial
+    for column in aggregation.notna:
+        rows = rows[rows[column].notna()]
+    measures = list(aggregation.measures)
+    if not aggregation.keys:
+        # Keyless totals keep each measure's own scalar type (ints stay ints).
+        sums, count = {measure: rows[measure].sum() for measure in measures}, rows[ROWS].sum()
+        if aggregation.func == 'sum':
+            return sums
+        if aggregation.func == 'count':
+            return dict.fromkeys(measures, count)
+        if aggregation.func == 'mean':
+            return {measure: total / count if count else float('nan') for measure, total in sums.items()}
+        raise ValueError(f'unsupported aggregation function: {aggregation.func!r}')
+    grouped = rows.groupby(list(aggregation.keys))
+    if aggregation.func == 'sum':
+        result = grouped[measures].sum()
+    elif aggregation.func == 'count':
+        counts = grouped[ROWS].sum()
+        result = pd.DataFrame({measure: counts for measure in measures})
+    elif aggregation.func == 'mean':
+        result = grouped[measures].sum().div(grouped[ROWS].sum(), axis=0)
+    else:
+        raise ValueError(f'unsupported aggregation function: {aggregation.func!r}')
+    return result.reset_index()
+
+
+def grouping(aggregations):
+    """The keys and measures of the one partial aggregate ``aggregations`` roll up from."""
+    keys = _unique(key for spec in aggregations.values() for key in spec.keys + spec.notna)
+    measures = _unique(measure for spec in aggregations.values() for measure in spec.measures)
+    return keys, measures
+
+
+def aggregate(frame, aggregations=AGGREGATIONS):
+    """Compute every aggregation in ``aggregations`` from one pass over ``frame``."""
+    partial = partial_aggregate(frame, *grouping(aggregations))
+    return {name: roll_up(partial, spec) for name, spec in aggregations.items()}
+
+
+class AggregationEngine:
+    """Memoized ``aggregate`` results for one dataset, keyed by filter state.
+
+    When a pre-aggregated ``cube`` covers the selection (see alviridi.cube),
+    results are rolled up from its cells instead of scanning rows. Sessions
+    missing the same filter state at once share one computation.
+    """
+
+    def __init__(self, frame, index, cube=None, aggregations=AGGREGATIONS, max_entries=256):
+        self.frame = frame
+        self.index = index
+        self.cube = cube
+        self.aggregations = aggregations
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def updated(self, frame, index, cube, changed):
+        """An engine for the next version of the dataset.
+
+        ``changed`` holds the old and new values of every inserted, updated
+        or replaced row. Memoized results for filter states none of those
+        rows match are still correct, so they carry over.
+        """
+        engine = AggregationEngine(frame, index, cube, self.aggregations, self.max_entries)
+        with self._lock:
+            results = list(self._results.items())
+        for key, result in results:
+            matches = np.ones(len(changed), dtype=bool)
+            for dimension, value in key:
+                if value is not None:
+                    matches &= (changed[dimension] == value).to_numpy()
+            if not matches.any():
+                engine._results[key] = result
+        return engine
+
+    def rows(self, selections):
+        """The rows of ``frame`` matching ``selections``."""
+        return self.index.take(self.frame, selections)
+
+    def _compute(self, selections):
+        if self.cube is not None and self.cube.covers(selections, self.aggregations):
+            partial = self.cube.slice(selections)
+            return {name: roll_up(partial, spec) for name, spec in self.aggregations.items()}
+        return aggregate(self.index.take(self.frame, selections), self.aggregations)
+
+    def compute(self, selections):
+        key = filter_key(selections)
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+        return self._flights.do(key, self._fill, key, selections)
+
+    def _fill(self, key, selections):
+        with self._lock:
+            # A flight for ``key`` may have finished since the lookup above.
+            if key in self._results:
+                return self._results[key]
+        with timed('aggregate'):
+            results = self._compute(selections)
+        self._remember(key, results)
+        return results
+
+    def _remember(self, key, results):
+        with self._lock:
+            self._results[key] = results
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            stats = {'entries': len(self._results), 'hits': self.hits, 'misses': self.misses}
+        return {**stats, 'coalesced': self._flights.coalesced}
@@ -0,0 +1,58 @@
+"""Chart backends: how a chart's spec and data reach the browser.
+
+``matplotlib`` rasterises each chart on the server (in the render pool) and
+ships an image. ``vega-lite`` ships a Vega-Lite document with the chart's
+pre-aggregated data and lets the browser draw it, with hover tooltips and
+no server-side drawing.
+
+The deployment picks one with ALVIRIDI_CHART_BACKEND (default matplotlib).
+Either way the encoded payload is cached in the figure cache under the
+backend's format.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+FIGURE_FORMAT = os.environ.get('ALVIRIDI_FIGURE_FORMAT', 'png')
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    format: str  # part of the figure cache key
+    encode: Callable  # (spec, data) -> bytes; module-level, so it pickles
+    show: Callable  # (slot, payload) -> None
+    pooled: bool  # encode in the render pool rather than inline
+
+
+def _encode_image(spec, data):
+    from alviridi.render import render_image
+    return render_image(spec, data, FIGURE_FORMAT)
+
+
+def _show_image(slot, image):
+    slot.image(image.decode() if FIGURE_FORMAT == 'svg' else image, width='stretch')
+
+
+def _encode_vega_lite(spec, data):
+    from alviridi.vegalite import render_json
+    return render_json(spec, data)
+
+
+def _show_vega_lite(slot, document):
+    slot.vega_lite_chart(spec=json.loads(document), width='stretch')
+
+
+BACKENDS = {
+    'matplotlib': Backend('matplotlib', FIGURE_FORMAT, _encode_image, _show_image, pooled=True),
+    'vega-lite': Backend('vega-lite', 'vega-lite', _encode_vega_lite, _show_vega_lite, pooled=False),
+}
+
+
+def get_backend(name=None):
+    name = name or os.environ.get('ALVIRIDI_CHART_BACKEND', 'matplotlib')
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f'unknown chart backend {name!r}; expected one of {", ".join(BACKENDS)}') from None
@@ -0,0 +1,382 @@
+"""Chart definitions for the analysis tabs.
+
+Each chart is registered with ``@chart(tab, chart_id, spec, reduce)``. The
+decorated function returns the frame the chart plots, the reduction policies
+(alviridi.reduce) bound how much of it is drawn, and the spec (alviridi.specs)
+says how to draw it, so rendering never needs the full dataset.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from alviridi.aggregate import SCOPE_COLUMNS
+from alviridi.instrument import timed
+from alviridi.reduce import Binned, SampleRows, TopN, apply_policies
+from alviridi.schema import plain_categories
+from alviridi.specs import LEGEND_OUTSIDE, Bar, ChartSpec, Pie, Scatter
+
+# Chart id -> Chart, in display order.
+CHARTS = {}
+
+
+@dataclass(frozen=True)
+class ChartContext:
+    rows: pd.DataFrame  # filtered rows; shared, so treat as read-only
+    aggregates: dict  # AggregationEngine results for the same filter state
+    selections: dict  # the filter state itself
+    version: str  # Dataset.version the rows and aggregates came from
+
+
+@dataclass(frozen=True)
+class Chart:
+    id: str
+    tab: str
+    spec: ChartSpec
+    data: Callable[[ChartContext], pd.DataFrame]
+    reduce: tuple = ()
+
+
+def chart(tab, chart_id, spec, reduce=()):
+    def register(data):
+        CHARTS[chart_id] = Chart(chart_id, tab, spec, data, tuple(reduce))
+        return data
+    return register
+
+
+def charts_for(tab):
+    return [chart for chart in CHARTS.values() if chart.tab == tab]
+
+
+def chart_data(chart, context):
+    """The frame ``chart`` plots for ``context``, reduced and with plain axis labels."""
+    with timed('chart_data', chart.id):
+        return apply_policies(plain_categories(chart.data(context)), chart.spec, chart.reduce)
+
+
+# Investment Analysis
+
+@chart('Investment Analysis', 'investment.size_vs_investment', Bar(
+    x='Fund', y='Size vs Investment', palette='viridis', dpi=60, xtick_rotation=0,
+    title='Fund Size vs Actual Investment', xlabel='Fund', ylabel='Difference (Fund Size - Investment) ($M)',
+), reduce=[TopN('Fund'), SampleRows('Fund')])
+def investment_size_vs_investment(context):
+    # 1. Which funds have the largest size vs. actual investment?
+    return context.rows[['Fund', 'Fund Size ($M)', 'Investment ($M)', 'Size vs Investment']]
+
+
+@chart('Investment Analysis', 'investment.percentage_invested', Bar(
+    x='Fund', y='Percentage Invested', palette='rocket', dpi=60, xtick_rotation=0,
+    title='Percentage of Total Capital Committed that has been Invested', xlabel='Fund', ylabel='Percentage (%)',
+), reduce=[TopN('Fund'), SampleRows('Fund')])
+def investment_percentage_invested(context):
+    # 2. Percentage of total capital committed that has been invested
+    return context.rows[['Fund', 'Investment ($M)', 'Total Capital Committed ($B)', 'Percentage Invested']]
+
+
+@chart('Investment Analysis', 'investment.country_capital', Bar(
+    x='Country Capital Catalyzed ($M)', y='Country', palette='magma', dpi=60,
+    title='Capital Catalyzed by Country', xlabel='Capital Catalyzed ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def investment_country_capital(context):
+    # 3. Capital catalyzed in different countries
+    return context.aggregates['country_capital']
+
+
+@chart('Investment Analysis', 'investment.theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Theme', palette='cubehelix', dpi=60,
+    title='Capital Catalyzed by Theme', xlabel='Capital Catalyzed ($M)', ylabel='Theme',
+), reduce=[TopN('Theme', combine='sum')])
+def investment_theme_capital(context):
+    # 4. Theme Capital Catalyzed Analysis
+    return context.aggregates['theme_capital']
+
+
+@chart('Investment Analysis', 'investment.investment_vs_fund_size', Scatter(
+    x='Fund Size ($M)', y='Investment ($M)', hue='Fund', palette='deep', size=100, dpi=60, legend=LEGEND_OUTSIDE,
+    title='Investment vs Fund Size', xlabel='Fund Size ($M)', ylabel='Investment ($M)',
+), reduce=[TopN('Fund', n=10), Binned()])
+def investment_investment_vs_fund_size(context):
+    # 5. Compare Investment ($M) with Fund Size ($M)
+    return context.rows[['Fund', 'Fund Size ($M)', 'Investment ($M)']]
+
+
+@chart('Investment Analysis', 'investment.committed_vs_fund_investments', Scatter(
+    x='Total Capital Committed ($B)', y='Fund Investments', hue='Fund', palette='Paired', size=100, dpi=60,
+    legend=LEGEND_OUTSIDE,
+    title='Total Capital Committed vs Fund Investments', xlabel='Total Capital Committed ($B)', ylabel='Fund Investments',
+), reduce=[TopN('Fund', n=10), Binned()])
+def investment_committed_vs_fund_investments(context):
+    # 6. Analyze Total Capital Committed ($B) with Fund Investments
+    return context.rows[['Fund', 'Total Capital Committed ($B)', 'Fund Investments']]
+
+
+# Geographic Impact Analysis
+
+@chart('Geographic Impact Analysis', 'geographic.country_investment', Bar(
+    x='Investment ($M)', y='Country', palette='viridis', tight_layout=False,
+    title='Total Investments by Country', xlabel='Total Investment ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def geographic_country_investment(context):
+    # 1. Which countries receive the most investment?
+    return context.aggregates['country_investment'].sort_values('Investment ($M)', ascending=False)
+
+
+@chart('Geographic Impact Analysis', 'geographic.global_south_deals', Bar(
+    x='Global South Deals Funded', y='Global South Countries Supported', palette='magma', tight_layout=False,
+    title='Global South Deals Funded by Country', xlabel='Number of Deals Funded',
+    ylabel='Global South Countries Supported',
+))
+def geographic_global_south_deals(context):
+    # 2. Number of deals made in the Global South vs. other regions
+    return context.aggregates['global_south_deals'].sort_values('Global South Deals Funded', ascending=False)
+
+
+@chart('Geographic Impact Analysis', 'geographic.country_capital', Bar(
+    x='Country Capital Catalyzed ($M)', y='Country', palette='cubehelix', tight_layout=False,
+    title='Capital Catalyzed by Country', xlabel='Capital Catalyzed ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def geographic_country_capital(context):
+    # 3. Distribution of capital across supported countries
+    return context.aggregates['country_capital'].sort_values('Country Capital Catalyzed ($M)', ascending=False)
+
+
+@chart('Geographic Impact Analysis', 'geographic.country_deals', Bar(
+    x='Global South Deals Funded', y='Country', palette='crest', tight_layout=False,
+    title='Global South Deals Funded by Country', xlabel='Number of Deals Funded', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def geographic_country_deals(context):
+    # 4. Assess which Global South countries are receiving more deals
+    return context.aggregates['country_deals'].sort_values('Global South Deals Funded', ascending=False)
+
+
+@chart('Geographic Impact Analysis', 'geographic.country_capital_ranking', Bar(
+    x='Country Capital Catalyzed ($M)', y='Country', palette='rocket', tight_layout=False,
+    title='Ranking Countries by Capital Catalyzed', xlabel='Capital Catalyzed ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def geographic_country_capital_ranking(context):
+    # 5. Rank countries by the amount of capital catalyzed
+    return context.aggregates['country_capital'].sort_values('Country Capital Catalyzed ($M)', ascending=False)
+
+
+@chart('Geographic Impact Analysis', 'geographic.global_south_theme_capital', Bar(
+    x='Country Capital Catalyzed ($M)', y='Global South Countries Supported', hue='Theme', palette='Set2',
+    tight_layout=False, legend={'title': 'Theme', **LEGEND_OUTSIDE},
+    title='Capital Catalyzed by Theme in Global South Countries', xlabel='Capital Catalyzed ($M)',
+    ylabel='Global South Countries Supported',
+), reduce=[TopN('Theme', n=10, combine='sum')])
+def geographic_global_south_theme_capital(context):
+    # 6. Analyze Global South Countries Supported with Theme
+    return context.aggregates['global_south_theme']
+
+
+# Thematic Analysis
+
+@chart('Thematic Analysis', 'thematic.theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Theme', palette='viridis',
+    title='Capital Attracted by Themes', xlabel='Capital Attracted ($M)', ylabel='Theme',
+), reduce=[TopN('Theme', combine='sum')])
+def thematic_theme_capital(context):
+    # 1. Which themes are attracting the most capital?
+    return context.aggregates['theme_capital'].sort_values('Theme Capital Catalyzed ($M)', ascending=False)
+
+
+@chart('Thematic Analysis', 'thematic.country_theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Country', hue='Theme', palette='Set2', figsize=(14, 8),
+    legend={'title': 'Theme', **LEGEND_OUTSIDE},
+    title='Thematic Capital Distribution Across Countries', xlabel='Capital Attracted ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum'), TopN('Theme', n=10, combine='sum')])
+def thematic_country_theme_capital(context):
+    # 2. How do the themes vary across different countries?
+    return context.aggregates['country_theme_capital']
+
+
+@chart('Thematic Analysis', 'thematic.global_south_theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Theme', palette='magma',
+    title='Capital Attracted by Themes in the Global South', xlabel='Capital Attracted ($M)', ylabel='Theme',
+), reduce=[TopN('Theme', combine='sum')])
+def thematic_global_south_theme_capital(context):
+    # 3. Are certain themes more prevalent in the Global South?
+    return context.aggregates['global_south_theme_capital'].sort_values('Theme Capital Catalyzed ($M)', ascending=False)
+
+
+@chart('Thematic Analysis', 'thematic.fund_theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Fund', hue='Theme', palette='cubehelix', figsize=(14, 8),
+    legend={'title': 'Theme', **LEGEND_OUTSIDE},
+    title='Capital by Theme and Fund', xlabel='Capital Attracted ($M)', ylabel='Fund',
+), reduce=[TopN('Fund', combine='sum'), TopN('Theme', n=10, combine='sum')])
+def thematic_fund_theme_capital(context):
+    # 4. Compare Theme Capital Catalyzed ($M) with Fund
+    return context.aggregates['fund_theme_capital']
+
+
+@chart('Thematic Analysis', 'thematic.region_theme_capital', Bar(
+    x='Theme Capital Catalyzed ($M)', y='Country', hue='Theme', palette='rocket', figsize=(14, 8),
+    legend={'title': 'Theme', **LEGEND_OUTSIDE},
+    title='Thematic Investment Distribution by Region', xlabel='Capital Attracted ($M)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum'), TopN('Theme', n=10, combine='sum')])
+def thematic_region_theme_capital(context):
+    # 5. Compare thematic investment in different regions
+    return context.aggregates['country_theme_capital']
+
+
+# Environmental Impact Analysis
+
+@chart('Environmental Impact Analysis', 'environmental.fund_emissions', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Fund', palette='Blues', dpi=60,
+    title='Total Emissions by Fund', xlabel='Total Emissions (tons of CO2e)', ylabel='Fund',
+), reduce=[TopN('Fund', combine='sum')])
+def environmental_fund_emissions(context):
+    # 1. Which funds or investments have the highest total emissions?
+    return context.aggregates['fund_emissions'].sort_values('Total Emissions by Fund (tons of CO2e)', ascending=False)
+
+
+@chart('Environmental Impact Analysis', 'environmental.fund_emissions_share', Pie(
+    values='Total Emissions by Fund (tons of CO2e)', labels='Fund', palette='Blues', dpi=60,
+    title='Proportion of Total Emissions by Fund',
+), reduce=[TopN('Fund', n=10, combine='sum')])
+def environmental_fund_emissions_share(context):
+    # Pie chart for Total Emissions by Fund
+    return context.aggregates['fund_emissions']
+
+
+@chart('Environmental Impact Analysis', 'environmental.fund_scope_emissions', Bar(
+    x='Emissions', y='Fund', hue='Scope', palette='pastel', dpi=60, legend={'title': 'Emission Scope'},
+    title='Scope 1, 2, and 3 Emissions by Fund', xlabel='Emissions (tons of CO2e)', ylabel='Fund',
+), reduce=[TopN('Fund'), SampleRows('Fund')])
+def environmental_fund_scope_emissions(context):
+    # 2. How do Scope 1, 2, and 3 emissions vary by fund?
+    return context.rows.melt(id_vars='Fund', value_vars=list(SCOPE_COLUMNS), var_name='Scope', value_name='Emissions')
+
+
+@chart('Environmental Impact Analysis', 'environmental.scope_emissions_share', Pie(
+    values='Emissions', labels='Scope', palette='pastel', dpi=60,
+    title='Proportion of Emissions by Scope',
+))
+def environmental_scope_emissions_share(context):
+    # Pie chart for Scope Emissions
+    return pd.DataFrame(list(context.aggregates['scope_totals'].items()), columns=['Scope', 'Emissions'])
+
+
+@chart('Environmental Impact Analysis', 'environmental.theme_emissions', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Theme', palette='Reds', dpi=60,
+    title='Total Emissions by Theme', xlabel='Total Emissions (tons of CO2e)', ylabel='Theme',
+), reduce=[TopN('Theme', combine='sum')])
+def environmental_theme_emissions(context):
+    # 3. What are the emissions trends across different themes?
+    return context.aggregates['theme_emissions'].sort_values('Total Emissions by Fund (tons of CO2e)', ascending=False)
+
+
+@chart('Environmental Impact Analysis', 'environmental.theme_emissions_share', Pie(
+    values='Total Emissions by Fund (tons of CO2e)', labels='Theme', palette='Reds', dpi=60,
+    title='Proportion of Total Emissions by Theme',
+), reduce=[TopN('Theme', n=10, combine='sum')])
+def environmental_theme_emissions_share(context):
+    # Pie chart for Total Emissions by Theme
+    return context.aggregates['theme_emissions']
+
+
+@chart('Environmental Impact Analysis', 'environmental.country_scope_emissions', Bar(
+    x='Emissions', y='Country', hue='Scope', palette='Set1', dpi=60, legend={'title': 'Emission Scope'},
+    title='Scope 1, 2, and 3 Emissions by Country', xlabel='Emissions (tons of CO2e)', ylabel='Country',
+), reduce=[TopN('Country'), SampleRows('Country')])
+def environmental_country_scope_emissions(context):
+    # 4. Combine Scope Emissions with Country
+    return context.rows.melt(id_vars='Country', value_vars=list(SCOPE_COLUMNS), var_name='Scope', value_name='Emissions')
+
+
+@chart('Environmental Impact Analysis', 'environmental.country_emissions_share', Pie(
+    values='Emissions', labels='Country', palette='husl', dpi=60,
+    title='Proportion of Emissions by Country',
+), reduce=[TopN('Country', n=10, combine='sum')])
+def environmental_country_emissions_share(context):
+    # Pie chart for Country Scope Emissions
+    country_scope = context.aggregates['country_scope_emissions'].set_index('Country')
+    return country_scope.sum(axis=1).rename('Emissions').reset_index()
+
+
+@chart('Environmental Impact Analysis', 'environmental.fund_theme_emissions', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Fund', hue='Theme', palette='coolwarm', dpi=60,
+    legend={'title': 'Theme', **LEGEND_OUTSIDE},
+    title='Emissions by Fund and Theme', xlabel='Total Emissions (tons of CO2e)', ylabel='Fund',
+), reduce=[TopN('Fund', combine='sum'), TopN('Theme', n=10, combine='sum')])
+def environmental_fund_theme_emissions(context):
+    # 6. Compare Emissions by Fund with Theme
+    return context.aggregates['fund_theme_emissions']
+
+
+# Global South Investment Focus
+
+@chart('Global South Investment Focus', 'global_south.country_deals', Bar(
+    x='Global South Deals Funded', y='Country', palette='viridis', dpi=60,
+    title='Total Global South Deals Funded by Country', xlabel='Number of Deals Funded', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def global_south_country_deals(context):
+    # 2. What is the distribution of deals across these countries?
+    return context.aggregates['country_deals'].sort_values('Global South Deals Funded', ascending=False)
+
+
+@chart('Global South Investment Focus', 'global_south.country_emissions', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Country', palette='magma', dpi=60,
+    title='Total Emissions by Country in Global South', xlabel='Total Emissions (tons of CO2e)', ylabel='Country',
+), reduce=[TopN('Country'), SampleRows('Country')])
+def global_south_country_emissions(context):
+    # 3. What are the emissions patterns associated with investments in the Global South?
+    return context.rows[['Country', 'Total Emissions by Fund (tons of CO2e)', 'Investment ($M)']]
+
+
+@chart('Global South Investment Focus', 'global_south.deals_vs_investment', Scatter(
+    x='Global South Deals Funded', y='Investment ($M)', hue='Country', palette='Set2', dpi=60, legend=LEGEND_OUTSIDE,
+    title='Global South Deals Funded vs Investment ($M)', xlabel='Global South Deals Funded', ylabel='Investment ($M)',
+), reduce=[TopN('Country', n=10), Binned()])
+def global_south_deals_vs_investment(context):
+    # 4. Compare Global South Deals Funded with Investment ($M)
+    return context.rows[['Country', 'Global South Deals Funded', 'Investment ($M)']]
+
+
+@chart('Global South Investment Focus', 'global_south.country_emissions_total', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Country', palette='Blues', dpi=60,
+    title='Total Emissions by Country in the Global South', xlabel='Total Emissions (tons of CO2e)', ylabel='Country',
+), reduce=[TopN('Country', combine='sum')])
+def global_south_country_emissions_total(context):
+    # 5. Combine Global South Countries Supported with Total Emissions by Fund
+    return context.aggregates['country_emissions'].sort_values('Total Emissions by Fund (tons of CO2e)', ascending=False)
+
+
+# Fund Performance Comparison
+
+@chart('Fund Performance Comparison', 'fund_performance.investment_vs_fund_size', Scatter(
+    x='Fund Size ($M)', y='Investment ($M)', hue='Fund', palette='Set1', size=100, dpi=60, identity_line=True,
+    legend=LEGEND_OUTSIDE,
+    title='Investment vs Fund Size by Fund', xlabel='Fund Size ($M)', ylabel='Investment ($M)',
+))
+def fund_performance_investment_vs_fund_size(context):
+    # 1. How do different funds perform in terms of investment vs. size?
+    return context.aggregates['fund_performance']
+
+
+@chart('Fund Performance Comparison', 'fund_performance.utilization_ratio', Bar(
+    x='Utilization Ratio', y='Fund', palette='Blues', dpi=60,
+    title='Fund Utilization Ratio', xlabel='Utilization Ratio (Investment / Fund Size)', ylabel='Fund',
+))
+def fund_performance_utilization_ratio(context):
+    # 2. Which funds are generating higher returns or catalyzing more capital?
+    return context.aggregates['fund_performance'].sort_values('Utilization Ratio', ascending=False)
+
+
+@chart('Fund Performance Comparison', 'fund_performance.emissions_per_investment', Bar(
+    x='Emissions per Investment', y='Fund', palette='Reds', dpi=60,
+    title='Emissions per Investment by Fund', xlabel='Emissions (tons of CO2e per $M Investment)', ylabel='Fund',
+))
+def fund_performance_emissions_per_investment(context):
+    # 3. Which funds have the lowest emissions relative to their investment size?
+    return context.aggregates['fund_performance'].sort_values('Emissions per Investment')
+
+
+@chart('Fund Performance Comparison', 'fund_performance.fund_emissions', Bar(
+    x='Total Emissions by Fund (tons of CO2e)', y='Fund', palette='Greens', dpi=60,
+    title='Total Emissions by Fund', xlabel='Total Emissions (tons of CO2e)', ylabel='Fund',
+))
+def fund_performance_fund_emissions(context):
+    # 4. Combine Fund with Total Emissions by Fund to compare environmental impacts across funds.
+    return context.aggregates['fund_performance'].sort_values('Total Emissions by Fund (tons of CO2e)', ascending=False)
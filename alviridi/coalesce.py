@@ -0,0 +1,52 @@
+"""Request coalescing: concurrent callers asking for the same result share one computation.
+
+Every Streamlit session reruns app.py in its own thread. When several open
+the same view at once they miss the same caches together and, without
+coordination, each computes the same aggregates. ``SingleFlight.do(key, ...)``
+lets the first caller for ``key`` (the leader) compute while the others
+block on its result, or its exception. Each AggregationEngine (one per
+data version) has its own, so a caller on a newer version never waits for
+an older one.
+
+Results are shared, not copied: callers must treat them as read-only.
+pandas copy-on-write keeps frames derived from them (column selections,
+filters, assign) from writing through.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """At most one computation in flight per key."""
+
+    def __init__(self):
+        self.coalesced = 0  # callers that waited on another's computation
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """``function(*args)``, or the result of the call already running for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.result()
+        try:
+            result = function(*args)
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'coalesced': self.coalesced}
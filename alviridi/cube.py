@@ -0,0 +1,69 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from alviridi.aggregate import ROWS, partial_aggregate
+from alviridi.schema import DTYPES
+
+# The sidebar's Country and Fund filters plus every key the charts group by.
+CUBE_DIMENSIONS = ('Fund', 'Country', 'Theme', 'Global South Countries Supported')
+
+# Every numeric column that is not itself a dimension.
+CUBE_MEASURES = tuple(
+    name for name, dtype in DTYPES.items()
+    if dtype in ('int32', 'float32') and name not in CUBE_DIMENSIONS
+)
+
+
+class Cube:
+    """Pre-aggregated sums and row counts for each combination of
+    ``dimensions`` (by default Fund x Country x Theme x Global South) present
+    in the data.
+
+    Selections on cube dimensions are answered by slicing these cells, so
+    their cost depends on the number of groups rather than the number of rows.
+    ``cells`` takes partial aggregates computed elsewhere (alviridi.outofcore)
+    instead of aggregating ``frame``.
+    """
+
+    def __init__(self, frame, dimensions=CUBE_DIMENSIONS, cells=None):
+        self.dimensions = tuple(dimensions)
+        if cells is None:
+            cells = partial_aggregate(frame, list(self.dimensions), list(CUBE_MEASURES))
+        self.cells = cells
+
+    def updated(self, added, removed):
+        """A new cube with the rows of ``added`` counted in and ``removed`` counted out.
+
+        Only the cells of the groups those rows fall in change; a cell left
+        with no rows is dropped.
+        """
+        dimensions, measures = list(self.dimensions), list(CUBE_MEASURES) + [ROWS]
+        removed = partial_aggregate(removed, dimensions, list(CUBE_MEASURES))
+        removed[measures] = -removed[measures]
+        added = partial_aggregate(added, dimensions, list(CUBE_MEASURES))
+        cells = pd.concat([part for part in (self.cells, added, removed) if len(part)], ignore_index=True)
+        cells = cells.groupby(dimensions, dropna=False, sort=False)[measures].sum().reset_index()
+        cube = copy.copy(self)
+        cube.cells = cells[cells[ROWS] != 0].reset_index(drop=True)
+        return cube
+
+    def __len__(self):
+        return len(self.cells)
+
+    def covers(self, selections, aggregations):
+        """Whether ``aggregations`` under ``selections`` can be answered from the cube."""
+        if any(value is not None and dimension not in self.dimensions for dimension, value in selections.items()):
+            return False
+        return all(
+            set(spec.keys + spec.notna) <= set(self.dimensions) and set(spec.measures) <= set(CUBE_MEASURES)
+            for spec in aggregations.values()
+        )
+
+    def slice(self, selections):
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dimension, value in selections.items():
+            if value is not None:
+                mask &= (self.cells[dimension] == value).to_numpy()
+        return self.cells[mask]
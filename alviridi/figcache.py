@@ -0,0 +1,167 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """Bounded LRU of encoded chart images.
+
+    Keys are (chart id, filter state, data version, format) tuples. When the
+    in-memory budget is exceeded the least recently used images are dropped,
+    or written to ``spill_dir`` if one is configured and read back on a miss.
+    Spilled files are kept within ``max_disk_bytes``: once over it, the
+    files least recently written or read (by mtime, which every spill and
+    spill hit touches) are deleted, which also clears images of data
+    versions no longer served.
+    """
+
+    def __init__(self, max_bytes, spill_dir=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.spill_hits = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._spilled())
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, hashlib.sha1(repr(key).encode()).hexdigest())
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._images:
+                return True
+        return bool(self.spill_dir) and os.path.exists(self._spill_path(key))
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), 'rb') as spilled:
+                    image = spilled.read()
+                self._touch(self._spill_path(key))
+            except FileNotFoundError:
+                pass
+            else:
+                with self._lock:
+                    self.spill_hits += 1
+                self.put(key, image)
+                return image
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, image):
+        evicted = []
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._images[key] = image
+            self.bytes += len(image)
+            while self.bytes > self.max_bytes and len(self._images) > 1:
+                old_key, old_image = self._images.popitem(last=False)
+                self.bytes -= len(old_image)
+                evicted.append((old_key, old_image))
+        if self.spill_dir:
+            for old_key, old_image in evicted:
+                self._spill(old_key, old_image)
+
+    def _spill(self, key, image):
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            self._touch(path)
+            return
+        partial = f'{path}.{threading.get_ident()}.partial'
+        with open(partial, 'wb') as spilled:
+            spilled.write(image)
+        os.replace(partial, path)
+        with self._disk_lock:
+            self._disk_bytes += len(image)
+        self._trim()
+
+    @staticmethod
+    def _touch(path):
+        # Many filesystems do not update atime on reads (relatime, noatime),
+        # so recency is kept in mtime.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _spilled(self):
+        # (mtime, path, size) of every complete spilled file.
+        files = []
+        with os.scandir(self.spill_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.partial'):
+                    continue
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((info.st_mtime, entry.path, info.st_size))
+        return files
+
+    def _trim(self):
+        # The running total counts this process's spills only; the directory
+        # is listed (and the total corrected) once it exceeds the budget.
+        # Deleting down to 90% leaves room before the next listing.
+        if self.max_disk_bytes is None:
+            return
+        with self._disk_lock:
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            files = sorted(self._spilled())
+            total = sum(size for _, _, size in files)
+            for _, path, size in files:
+                if total <= self.max_disk_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._disk_bytes = total
+
+    def flush(self):
+        """Write every in-memory image to ``spill_dir``, for other processes to read; returns the count."""
+        if not self.spill_dir:
+            return 0
+        with self._lock:
+            images = list(self._images.items())
+        for key, image in images:
+            self._spill(key, image)
+        return len(images)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'entries': len(self._images),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'spill_hits': self.spill_hits,
+                'misses': self.misses,
+            }
+        if self.spill_dir:
+            stats['disk_bytes'] = self._disk_bytes
+        return stats
+
+
+# Process-wide cache shared by every session.
+FIGURES = FigureCache(
+    max_bytes=int(float(os.environ.get('ALVIRIDI_FIGURE_CACHE_MB', 64)) * 2**20),
+    spill_dir=os.environ.get('ALVIRIDI_FIGURE_CACHE_DIR') or None,
+    max_disk_bytes=int(float(os.environ.get('ALVIRIDI_FIGURE_CACHE_DISK_MB', 1024)) * 2**20),
+)
@@ -0,0 +1,48 @@
+"""Figure lifecycle without pyplot.
+
+pyplot registers every figure it creates in a global manager and keeps it
+alive until ``plt.close`` is called, which on a long-running server is a
+leak waiting to happen. Figures here are plain ``matplotlib.figure.Figure``
+objects with an Agg canvas: nothing global refers to them, and ``borrow``
+hands out one reusable figure per (size, dpi) per thread, clearing it
+when the caller is done whether or not drawing succeeded.
+"""
+import threading
+from contextlib import contextmanager
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+_local = threading.local()
+
+
+def new_figure(figsize, dpi=None):
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def release(figure):
+    """Drop everything drawn on ``figure`` so it can be drawn on again."""
+    figure.clear()
+    # tight_layout() moves the subplot margins; clear() leaves them alone.
+    rc = matplotlib.rcParams
+    figure.subplots_adjust(**{side: rc[f'figure.subplot.{side}'] for side in (
+        'left', 'bottom', 'right', 'top', 'wspace', 'hspace')})
+
+
+@contextmanager
+def borrow(figsize, dpi=None):
+    """A blank figure of ``figsize`` inches, reused across calls on this thread."""
+    figures = getattr(_local, 'figures', None)
+    if figures is None:
+        figures = _local.figures = {}
+    key = (tuple(figsize), dpi)
+    figure = figures.pop(key, None) or new_figure(figsize, dpi)
+    try:
+        yield figure
+    finally:
+        release(figure)
+        # Nested borrows of the same size get their own figure; only one is kept.
+        figures[key] = figure
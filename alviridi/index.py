@@ -0,0 +1,92 @@
+import copy
+
+import numpy as np
+
+# Sidebar filter dimensions, in the order the selectboxes appear.
+FILTER_DIMENSIONS = ['Company Name', 'Country', 'Fund']
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class FilterIndex:
+    """Inverted index from each filter value to its (sorted) row positions.
+
+    Built once per dataset, so a sidebar selection costs a few sorted-array
+    intersections instead of boolean-mask scans over every row.
+    """
+
+    def __init__(self, frame, options=None):
+        self.options = {}
+        self.positions = {}
+        for dimension in FILTER_DIMENSIONS:
+            column = frame[dimension]
+            codes = column.cat.codes.to_numpy()
+            # A stable sort keeps each value's positions in ascending order.
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))
+            order = order[len(codes) - counts.sum():]  # missing values (code -1) sort first
+            groups = np.split(order, np.cumsum(counts)[:-1])
+            self.positions[dimension] = {
+                value: positions for value, positions in zip(column.cat.categories, groups) if len(positions)
+            }
+            # Same first-appearance order as ``column.unique()``.
+            self.options[dimension] = column.dropna().unique().tolist()
+        if options is not None:
+            # Values of the full data when ``frame`` is only a sample of it.
+            self.options.update(options)
+
+    def updated(self, frame, replaced, previous, appended_from):
+        """A new index for ``frame`` after rows changed in place or were appended.
+
+        ``replaced`` are the positions whose values changed and ``previous``
+        the rows that used to be there; positions from ``appended_from`` on
+        are new. Only the posting lists of affected values are rebuilt.
+        """
+        index = copy.copy(self)
+        index.options, index.positions = {}, {}
+        replaced = np.asarray(replaced, dtype=np.int64)
+        changed = np.concatenate([replaced, np.arange(appended_from, len(frame))])
+        for dimension in FILTER_DIMENSIONS:
+            postings = dict(self.positions[dimension])
+            removed = previous[dimension].to_numpy()
+            for value in _present(removed):
+                postings[value] = np.setdiff1d(postings[value], replaced[removed == value], assume_unique=True)
+            added = frame[dimension].to_numpy()[changed]
+            for value in _present(added):
+                postings[value] = np.union1d(postings.get(value, _EMPTY), changed[added == value])
+            postings = {value: positions for value, positions in postings.items() if len(positions)}
+            index.positions[dimension] = postings
+            # Same first-appearance order as ``column.unique()``.
+            index.options[dimension] = sorted(postings, key=lambda value: postings[value][0])
+        return index
+
+    def select(self, selections):
+        """Row positions matching ``selections`` ({dimension: value or None}).
+
+        Returns None when nothing is selected, meaning "every row".
+        """
+        chosen = [
+            self.positions[dimension].get(value, _EMPTY)
+            for dimension, value in selections.items() if value is not None
+        ]
+        if not chosen:
+            return None
+        chosen.sort(key=len)
+        result = chosen[0]
+        for positions in chosen[1:]:
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
+
+    def take(self, frame, selections):
+        """The rows of ``frame`` matching ``selections``; ``frame`` itself if unfiltered."""
+        positions = self.select(selections)
+        return frame if positions is None else frame.take(positions)
+
+
+def _present(values):
+    return [value for value in dict.fromkeys(values.tolist()) if value == value]  # drops NaN
+
+
+def filter_key(selections):
+    # Hashable, order-independent identity of a filter state.
+    return tuple(sorted(selections.items()))
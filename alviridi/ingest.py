@@ -0,0 +1,177 @@
+"""Apply delta files to the loaded dataset instead of re-reading the export.
+
+A delta is a portfolio export (.csv, .arrow/.feather or .parquet) holding
+only new or changed rows. Rows are upserted by Company ID: a row whose ID is
+already loaded replaces that row in place, any other row is appended. The
+filter index, the cube and the memoized aggregates are updated from the
+changed rows alone (see ``FilterIndex.updated``, ``Cube.updated`` and
+``AggregationEngine.updated``), and the result is published as a new
+Dataset version in one step, so a session mid-rerun keeps the version it
+started with.
+
+``watch(path, drop_dir)`` polls a drop directory and applies the files that
+appear there in name order, moving each one to ``applied/`` or ``failed/``.
+Writers should create files under a dot-prefixed name and rename them into
+place when complete. Deltas live only in memory: when the base export itself
+changes it is re-read as usual and is assumed to include them.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from alviridi import columnar
+from alviridi.index import FILTER_DIMENSIONS
+from alviridi.loader import load_dataset, publish
+from alviridi.metrics import with_row_metrics
+from alviridi.schema import CATEGORY_COLUMNS, COLUMNS, DTYPES
+
+DELTA_EXTENSIONS = ('.csv', '.arrow', '.feather', '.parquet')
+APPLIED, FAILED = 'applied', 'failed'
+
+log = logging.getLogger(__name__)
+
+# One writer at a time per process; readers never wait on it.
+_ingest_lock = threading.Lock()
+_watchers = {}
+
+
+def read_delta(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.arrow', '.feather'):
+        return columnar.read_columnar(path)
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=COLUMNS).astype(DTYPES)
+    return pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES)
+
+
+def _widened_dtypes(frame, delta):
+    # Category columns gain the delta's new labels (appended, so existing
+    # codes keep their meaning); every other column keeps its dtype.
+    dtypes = dict(frame.dtypes)
+    for column in CATEGORY_COLUMNS:
+        categories = frame[column].cat.categories
+        new = delta[column].dropna().unique()
+        new = [value for value in new if value not in categories]
+        if new:
+            dtypes[column] = pd.CategoricalDtype(categories.append(pd.Index(new)))
+    return dtypes
+
+
+def upsert(dataset, delta):
+    """The Dataset that results from upserting ``delta``'s rows into ``dataset``."""
+    started = time.perf_counter()
+    if 'sample_rows' in dataset.stats:
+        raise ValueError('deltas cannot be applied to an out-of-core dataset, which holds only a sample of its rows')
+    if delta['Company ID'].isna().any():
+        raise ValueError('delta has rows without a Company ID')
+    frame = dataset.frame
+    ids = pd.Index(frame['Company ID'])
+    if not ids.is_unique:
+        raise ValueError('loaded data has duplicate Company IDs, so rows cannot be upserted by ID')
+    delta = with_row_metrics(delta.drop_duplicates('Company ID', keep='last'))
+    positions = ids.get_indexer(delta['Company ID'])
+    existing = positions >= 0
+    replaced = positions[existing]
+
+    dtypes = _widened_dtypes(frame, delta)
+    delta = delta.astype(dtypes)
+    body = frame.astype(dtypes)
+    if len(replaced):
+        updates = delta[existing]
+        for column in body.columns:
+            values = body[column].copy()
+            values.iloc[replaced] = updates[column].to_numpy()
+            body[column] = values
+    inserts = delta[~existing]
+    updated = pd.concat([body, inserts], ignore_index=True) if len(inserts) else body
+
+    previous = frame.iloc[replaced]
+    changed = updated.iloc[np.concatenate([replaced, np.arange(len(frame), len(updated))])]
+    index = dataset.index.updated(updated, replaced, previous, len(frame))
+    cube = dataset.aggregates.cube
+    if cube is not None:
+        cube = cube.updated(changed, previous)
+    aggregates = dataset.aggregates.updated(
+        updated, index, cube, pd.concat([previous[FILTER_DIMENSIONS], changed[FILTER_DIMENSIONS]]),
+    )
+
+    deltas = dataset.stats.get('deltas', 0) + 1
+    stats = {
+        **dataset.stats,
+        'rows': len(updated),
+        'cube_cells': len(cube) if cube is not None else 0,
+        'memory_bytes': int(updated.memory_usage(deep=True).sum()),
+        'deltas': deltas,
+        'delta_rows': len(delta),
+        'delta_seconds': time.perf_counter() - started,
+    }
+    version = f"{dataset.version.partition('+')[0]}+{deltas}"
+    return replace(dataset, frame=updated, version=version, index=index, aggregates=aggregates, stats=stats)
+
+
+def ingest_file(path, delta_path):
+    """Upsert the rows of ``delta_path`` into the dataset loaded from ``path`` and publish it."""
+    delta = read_delta(delta_path)
+    with _ingest_lock:
+        current = load_dataset(path)
+        dataset = upsert(current, delta)
+        if not publish(path, current, dataset):
+            raise RuntimeError(f'{path} was reloaded while {delta_path} was being applied')
+    return dataset
+
+
+def pending(drop_dir):
+    """Delta files waiting in ``drop_dir``, in the order they will be applied."""
+    names = sorted(
+        name for name in os.listdir(drop_dir)
+        if not name.startswith('.') and os.path.splitext(name)[1].lower() in DELTA_EXTENSIONS
+    )
+    return [os.path.join(drop_dir, name) for name in names]
+
+
+def _move(delta_path, folder):
+    target = os.path.join(os.path.dirname(delta_path), folder)
+    os.makedirs(target, exist_ok=True)
+    os.replace(delta_path, os.path.join(target, os.path.basename(delta_path)))
+
+
+def poll(path, drop_dir):
+    """Apply every delta waiting in ``drop_dir``; returns how many were applied."""
+    applied = 0
+    for delta_path in pending(drop_dir):
+        try:
+            dataset = ingest_file(path, delta_path)
+        except (OSError, ValueError, KeyError, RuntimeError):
+            log.exception('could not apply %s', delta_path)
+            _move(delta_path, FAILED)
+        else:
+            log.info('applied %s: %s rows, version %s', delta_path, dataset.stats['delta_rows'], dataset.version)
+            _move(delta_path, APPLIED)
+            applied += 1
+    return applied
+
+
+def watch(path, drop_dir, interval=5.0):
+    """Poll ``drop_dir`` for deltas to ``path`` on a daemon thread (once per process)."""
+    key = os.path.abspath(path), os.path.abspath(drop_dir)
+    with _ingest_lock:
+        if key in _watchers:
+            return _watchers[key]
+        os.makedirs(drop_dir, exist_ok=True)
+
+        def run():
+            while True:
+                try:
+                    poll(path, drop_dir)
+                except OSError:
+                    log.exception('could not poll %s', drop_dir)
+                time.sleep(interval)
+
+        thread = _watchers[key] = threading.Thread(target=run, name='alviridi-ingest', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,252 @@
+"""Timing and counting of the dashboard's stages, per process.
+
+Code under measurement wraps itself in ``timed(stage, chart=None)``. The
+stages are:
+
+* load: parsing the export and building the index and cube, or opening a database;
+* filter: selecting the rows of a filter state;
+* aggregate: computing the aggregates of a filter state (memo misses only);
+* chart_data: preparing one chart's frame;
+* plot, tight_layout, savefig: seaborn drawing, layout and image encoding;
+* vega_lite: building a Vega-Lite document;
+* render: one chart's whole encode call;
+* latency: one chart from submission to the render pool until its image is back;
+* rerun: one run of app.py.
+
+Each (stage, chart) pair keeps a count, a sum, the last and largest
+duration, and a histogram. Encodes run in render workers, so ``measured``
+captures the samples taken during a call and returns them with its result
+for ``METRICS.merge`` to record in the server process.
+
+``METRICS.prometheus()`` renders everything in the Prometheus text format,
+and ``serve(port)`` exposes it at ``/metrics`` (ALVIRIDI_METRICS_PORT), on
+loopback unless ALVIRIDI_METRICS_HOST says otherwise.
+Chart renders slower than ALVIRIDI_SLOW_RENDER_MS (default 2000) are logged
+as JSON lines on the ``alviridi.instrument`` logger.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+SLOW_RENDER_SECONDS = float(os.environ.get('ALVIRIDI_SLOW_RENDER_MS', 2000)) / 1000
+# The metrics reveal filter use and data sizes: keep them off the network by default.
+METRICS_HOST = os.environ.get('ALVIRIDI_METRICS_HOST', '127.0.0.1')
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class Stat:
+    __slots__ = ('count', 'total', 'last', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = self.last = self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+def peak_rss():
+    """Peak resident memory of this process in bytes, or None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+class Metrics:
+    """Durations by (stage, chart), plus the peak memory of each render worker."""
+
+    def __init__(self):
+        self._stats = {}
+        self._worker_peaks = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, chart=None):
+        with self._lock:
+            stat = self._stats.get((stage, chart))
+            if stat is None:
+                stat = self._stats[stage, chart] = Stat()
+            stat.add(seconds)
+        if stage == 'render' and seconds > SLOW_RENDER_SECONDS:
+            log.warning(json.dumps({'event': 'slow_render', 'chart': chart, 'ms': round(seconds * 1000, 1)}))
+
+    def merge(self, samples, chart=None):
+        """Record the samples ``measured`` returned, under ``chart``."""
+        for stage, seconds in samples['timings']:
+            self.observe(stage, seconds, chart)
+        if samples['peak_rss'] is not None and samples['pid'] != os.getpid():
+            with self._lock:
+                self._worker_peaks[samples['pid']] = samples['peak_rss']
+
+    def snapshot(self):
+        """{(stage, chart): (count, total, last, max)} and {worker pid: peak bytes}."""
+        with self._lock:
+            stats = {key: (s.count, s.total, s.last, s.max) for key, s in self._stats.items()}
+            return stats, dict(self._worker_peaks)
+
+    def summary(self):
+        """Rows for display: one per stage (over all charts) and one per chart."""
+        stats, _ = self.snapshot()
+        stages, charts = {}, {}
+        for (stage, chart), (count, total, last, peak) in sorted(stats.items(), key=lambda item: item[0][1] or ''):
+            row = stages.setdefault(stage, {'stage': stage, 'count': 0, 'total': 0.0, 'max ms': 0.0})
+            row['count'] += count
+            row['total'] += total
+            row['max ms'] = max(row['max ms'], peak * 1000)
+            if chart is not None:
+                row = charts.setdefault(chart, {'chart': chart})
+                row[f'{stage} ms'] = total / count * 1000
+                if stage == 'render':
+                    row.update({'renders': count, 'last render ms': last * 1000, 'max render ms': peak * 1000})
+        stage_rows = [
+            {'stage': row['stage'], 'count': row['count'], 'mean ms': row['total'] / row['count'] * 1000,
+             'max ms': row['max ms']}
+            for row in stages.values()
+        ]
+        columns = ['chart', 'renders', 'chart_data ms', 'render ms', 'last render ms', 'max render ms', 'latency ms'] + [
+            f'{stage} ms' for stage in ('plot', 'tight_layout', 'savefig', 'vega_lite')
+        ]
+        columns = [column for column in columns if any(column in row for row in charts.values())]
+        return stage_rows, [{column: row.get(column) for column in columns} for row in charts.values()]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._worker_peaks.clear()
+
+    def prometheus(self, caches=None):
+        """The Prometheus text exposition of every metric.
+
+        ``caches`` maps a cache name to its stats() dict (hits, misses and
+        any other counts), exported as alviridi_cache_* series.
+        """
+        with self._lock:
+            stats = sorted(self._stats.items(), key=lambda item: (item[0][0], item[0][1] or ''))
+            lines = [
+                '# HELP alviridi_stage_seconds Time spent per stage and chart.',
+                '# TYPE alviridi_stage_seconds histogram',
+            ]
+            for (stage, chart), stat in stats:
+                labels = f'stage="{stage}"' + (f',chart="{chart}"' if chart else '')
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stat.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'alviridi_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'alviridi_stage_seconds_sum{{{labels}}} {stat.total!r}')
+                lines.append(f'alviridi_stage_seconds_count{{{labels}}} {stat.count}')
+            lines += ['# HELP alviridi_stage_seconds_max Slowest time per stage and chart.',
+                      '# TYPE alviridi_stage_seconds_max gauge']
+            lines += [
+                f'alviridi_stage_seconds_max{{stage="{stage}"' + (f',chart="{chart}"' if chart else '') + f'}} {stat.max!r}'
+                for (stage, chart), stat in stats
+            ]
+            worker_peaks = sorted(self._worker_peaks.items())
+        lines += ['# HELP alviridi_peak_rss_bytes Peak resident memory per process.', '# TYPE alviridi_peak_rss_bytes gauge']
+        server_peak = peak_rss()
+        if server_peak is not None:
+            lines.append(f'alviridi_peak_rss_bytes{{process="server"}} {server_peak}')
+        lines += [f'alviridi_peak_rss_bytes{{process="worker",pid="{pid}"}} {peak}' for pid, peak in worker_peaks]
+        series = {}
+        for name, values in (caches or {}).items():
+            for key, value in values.items():
+                series.setdefault(key, []).append((name, value))
+        for key, values in series.items():
+            counter = key in ('hits', 'misses', 'spill_hits', 'coalesced')
+            metric = f'alviridi_cache_{key}' + ('_total' if counter else '')
+            lines.append(f'# TYPE {metric} {"counter" if counter else "gauge"}')
+            lines += [f'{metric}{{cache="{name}"}} {value}' for name, value in values]
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry.
+METRICS = Metrics()
+
+
+def record(stage, seconds, chart=None):
+    captured = getattr(_local, 'captured', None)
+    if captured is not None:
+        captured.append((stage, seconds))
+    else:
+        METRICS.observe(stage, seconds, chart)
+
+
+@contextmanager
+def timed(stage, chart=None):
+    """Record how long the block takes as ``stage`` (of ``chart``)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started, chart)
+
+
+def measured(function, *args):
+    """``function(*args)`` timed as 'render', plus the samples taken during it.
+
+    Returns (result, samples) for ``METRICS.merge``; module-level, so render
+    workers can run it.
+    """
+    previous, _local.captured = getattr(_local, 'captured', None), []
+    try:
+        with timed('render'):
+            result = function(*args)
+        return result, {'timings': _local.captured, 'pid': os.getpid(), 'peak_rss': peak_rss()}
+    finally:
+        _local.captured = previous
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def serve(port, caches=dict, host=None):
+    """Serve ``METRICS.prometheus(caches())`` at http://host:port/metrics (once per process).
+
+    ``host`` defaults to METRICS_HOST; pass '0.0.0.0' to listen on every interface.
+    """
+    host = METRICS_HOST if host is None else host
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = METRICS.prometheus(caches()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _servers_lock:
+        if (host, port) not in _servers:
+            server = _servers[host, port] = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=server.serve_forever, name='alviridi-metrics', daemon=True).start()
+        return _servers[host, port]
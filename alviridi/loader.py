@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from alviridi import columnar, outofcore
+from alviridi.aggregate import AggregationEngine
+from alviridi.cube import Cube
+from alviridi.index import FilterIndex
+from alviridi.instrument import timed
+from alviridi.metrics import with_row_metrics
+from alviridi.schema import COLUMNS, DTYPES
+
+# Rows per chunk in out-of-core mode (alviridi.outofcore); 0 loads whole files.
+CHUNK_ROWS = int(os.environ.get('ALVIRIDI_CHUNK_ROWS') or 0)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """One parsed version of the portfolio file.
+
+    The frame is shared by every session, so callers must treat it as
+    read-only and derive new frames instead of assigning columns in place.
+    """
+    frame: pd.DataFrame
+    version: str
+    index: FilterIndex
+    aggregates: AggregationEngine
+    stats: dict = field(default_factory=dict)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def read_portfolio(path):
+    """Read a portfolio export (.csv, .arrow/.feather or .parquet).
+
+    CSV exports are converted to a columnar cache on first use and read from
+    that cache afterwards; see alviridi.columnar.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.arrow', '.feather'):
+        return columnar.read_columnar(path)
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=COLUMNS).astype(DTYPES)
+    arrow_path = columnar.cache_path(path)
+    try:
+        if not columnar.is_fresh(path, arrow_path):
+            columnar.convert(path, arrow_path)
+    except OSError:
+        # Read-only deployments fall back to parsing the CSV directly.
+        return pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES)
+    return columnar.read_columnar(arrow_path)
+
+
+def _build_out_of_core(signature, chunk_rows):
+    path, mtime_ns, size = signature
+    started = time.perf_counter()
+    cells, options, sample, rows = outofcore.scan(path, chunk_rows)
+    sample = with_row_metrics(sample)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index = FilterIndex(sample, options)
+    index_seconds = time.perf_counter() - started
+    cube = Cube(None, cells=cells)
+    stats = {
+        'path': path,
+        'rows': rows,
+        'sample_rows': len(sample),
+        'chunk_rows': chunk_rows,
+        'file_bytes': size,
+        'load_seconds': load_seconds,
+        'index_seconds': index_seconds,
+        'cube_seconds': 0.0,  # built while loading
+        'cube_cells': len(cube),
+        'memory_bytes': int(sample.memory_usage(deep=True).sum() + cells.memory_usage(deep=True).sum()),
+    }
+    return Dataset(
+        frame=sample, version=f'{path}@{mtime_ns}-{size}', index=index,
+        aggregates=outofcore.ChunkedAggregations(path, chunk_rows, sample, index, cube), stats=stats,
+    )
+
+
+def _build_dataset(signature):
+    if CHUNK_ROWS:
+        return _build_out_of_core(signature, CHUNK_ROWS)
+    path, mtime_ns, size = signature
+    started = time.perf_counter()
+    frame = with_row_metrics(read_portfolio(path))
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index = FilterIndex(frame)
+    index_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    cube = Cube(frame)
+    cube_seconds = time.perf_counter() - started
+    stats = {
+        'path': path,
+        'rows': len(frame),
+        'file_bytes': size,
+        'load_seconds': load_seconds,
+        'index_seconds': index_seconds,
+        'cube_seconds': cube_seconds,
+        'cube_cells': len(cube),
+        'memory_bytes': int(frame.memory_usage(deep=True).sum()),
+    }
+    return Dataset(
+        frame=frame, version=f'{path}@{mtime_ns}-{size}', index=index,
+        aggregates=AggregationEngine(frame, index, cube), stats=stats,
+    )
+
+
+# Process-wide cache: the latest Dataset per file, shared by all sessions.
+# Replaced when the file's mtime or size changes, or when alviridi.ingest
+# publishes a version with deltas applied.
+_datasets = {}
+_lock = threading.Lock()
+
+
+def load_dataset(path):
+    """Return the cached Dataset for ``path``, re-parsing only if it changed."""
+    signature = file_signature(path)
+    with _lock:
+        cached = _datasets.get(signature[0])
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with timed('load'):
+            dataset = _build_dataset(signature)
+        _datasets[signature[0]] = (signature, dataset)
+        return dataset
+
+
+def publish(path, current, dataset):
+    """Make ``dataset`` the version ``load_dataset(path)`` returns.
+
+    Succeeds only if ``current`` is still the published version, so two
+    writers cannot silently overwrite each other's update. Sessions that
+    already hold ``current`` keep using it until their next rerun.
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        cached = _datasets.get(key)
+        if cached is None or cached[1] is not current:
+            return False
+        _datasets[key] = (cached[0], dataset)
+        return True
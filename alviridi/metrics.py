@@ -0,0 +1,75 @@
+"""Derived metrics, declared once and computed vectorized.
+
+``ROW_METRICS`` are per-row columns added to the data when it is loaded
+(``with_row_metrics``), so charts select them like any other column instead
+of recomputing them on every rerun.
+
+Ratios across many rows are not the mean of per-row ratios. Aggregate-level
+metrics are therefore attached to an Aggregation (``metrics=``) and computed
+by ``roll_up`` from the group's sums, so they are cached with the rest of
+the aggregates.
+
+A zero or missing denominator gives NaN, which charts leave out, rather
+than inf or a warning.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Ratio:
+    """``scale * numerator / denominator``."""
+    numerator: str
+    denominator: str
+    scale: float = 1.0
+    dtype: str = 'float32'
+
+    @property
+    def inputs(self):
+        return (self.numerator, self.denominator)
+
+    def __call__(self, values):
+        numerator = np.asarray(values[self.numerator], dtype='float64')
+        denominator = np.asarray(values[self.denominator], dtype='float64')
+        valid = (denominator != 0) & ~np.isnan(denominator)
+        result = np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=valid)
+        return (result * self.scale).astype(self.dtype)
+
+
+@dataclass(frozen=True)
+class Difference:
+    """``minuend - subtrahend``."""
+    minuend: str
+    subtrahend: str
+    dtype: str = 'int32'
+
+    @property
+    def inputs(self):
+        return (self.minuend, self.subtrahend)
+
+    def __call__(self, values):
+        return (np.asarray(values[self.minuend]) - np.asarray(values[self.subtrahend])).astype(self.dtype)
+
+
+ROW_METRICS = {
+    'Size vs Investment': Difference('Fund Size ($M)', 'Investment ($M)'),
+    # Capital committed is in $B, investment in $M.
+    'Percentage Invested': Ratio('Investment ($M)', 'Total Capital Committed ($B)', scale=100 / 1000),
+}
+
+ROW_DTYPES = {name: metric.dtype for name, metric in ROW_METRICS.items()}
+
+
+def with_row_metrics(frame, metrics=ROW_METRICS):
+    """``frame`` with a column added for each row-level metric."""
+    return frame.assign(**{name: pd.Series(metric(frame), index=frame.index) for name, metric in metrics.items()})
+
+
+def apply_metrics(result, metrics):
+    """Add ``metrics`` (name -> metric) to a roll-up result: a frame, or a dict of scalars."""
+    if isinstance(result, dict):
+        values = {name: np.asarray([value]) for name, value in result.items()}
+        return {**result, **{name: metric(values)[0].item() for name, metric in metrics.items()}}
+    return result.assign(**{name: metric(result) for name, metric in metrics.items()})
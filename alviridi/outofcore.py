@@ -0,0 +1,246 @@
+"""Chunked loading for exports larger than memory.
+
+The export is read ``chunk_rows`` rows at a time and never held whole. Each
+chunk is reduced to mergeable partial aggregates (sums and row counts per
+combination of the cube dimensions, see ``partial_aggregate``), which are
+merged a batch at a time. Filter options are collected along the way, and a
+fixed-size uniform sample of rows is kept for the charts that plot rows
+rather than aggregates. Peak memory is one chunk plus the cube cells plus
+the sample, whatever the size of the file.
+
+Aggregations under Country and Fund selections are answered from the cube,
+whose size depends on the number of funds, countries and themes rather
+than on the rows. A company selection is answered by one more pass over
+the file that keeps only that company's rows (filtered before they are
+converted to pandas), memoized like any other result.
+
+Only the row-level charts see sampled rows. They come from the global
+sample, unless it holds fewer than ``STATE_ROWS`` of a selection's rows
+while the file has more (a company, or a small Fund x Country
+combination). Then a filtered pass over the file keeps up to
+``SAMPLE_ROWS`` of that selection's rows; for a company, this is the same
+pass that computes its aggregates.
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from alviridi import columnar
+from alviridi.aggregate import AGGREGATIONS, ROWS, AggregationEngine, grouping, partial_aggregate, roll_up
+from alviridi.coalesce import SingleFlight
+from alviridi.cube import CUBE_DIMENSIONS, CUBE_MEASURES
+from alviridi.index import FILTER_DIMENSIONS, filter_key
+from alviridi.metrics import with_row_metrics
+from alviridi.schema import COLUMNS, DTYPES, plain_categories
+
+SAMPLE_ROWS = 50_000
+
+# Fewest sampled rows of a selection the row-level charts are drawn from
+# (or all of its rows, if it has fewer) before it gets its own pass.
+STATE_ROWS = 200
+
+# Chunk partials merged at a time, so merging costs about one regrouping of
+# the cells per MERGE_EVERY chunks rather than one per chunk.
+MERGE_EVERY = 16
+
+_POSITION = '_position'
+
+
+def _matches(table, selections):
+    mask = None
+    for dimension, value in selections.items():
+        if value is None:
+            continue
+        column = table.column(dimension)
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        equal = pc.fill_null(pc.equal(column, value), False)
+        mask = equal if mask is None else pc.and_(mask, equal)
+    return mask
+
+
+def _rebatch(batches, chunk_rows):
+    # Tables of exactly ``chunk_rows`` rows (the last one fewer), whatever
+    # the sizes of the record batches in the file.
+    pending, rows = [], 0
+    for batch in batches:
+        while batch.num_rows:
+            take = min(batch.num_rows, chunk_rows - rows)
+            pending.append(batch.slice(0, take))
+            rows += take
+            batch = batch.slice(take)
+            if rows == chunk_rows:
+                yield pa.Table.from_batches(pending)
+                pending, rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def read_chunks(path, chunk_rows, selections=None):
+    """Yield the export at ``path`` as frames of at most ``chunk_rows`` rows.
+
+    With ``selections`` ({dimension: value or None}), only the matching rows
+    of each chunk are kept, before they are converted to pandas.
+    """
+    selections = selections or {}
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ('.arrow', '.feather', '.parquet'):
+        arrow_path = columnar.cache_path(path)
+        try:
+            if not columnar.is_fresh(path, arrow_path):
+                columnar.convert(path, arrow_path)
+        except OSError:
+            for chunk in pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES, chunksize=chunk_rows):
+                for dimension, value in selections.items():
+                    if value is not None:
+                        chunk = chunk[chunk[dimension] == value]
+                yield chunk
+            return
+        path, extension = arrow_path, '.arrow'
+    if extension == '.parquet':
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=COLUMNS)
+    else:
+        # A plain file rather than a memory map: mapped pages that were read
+        # stay resident, so RSS would grow with the file after all.
+        reader = ipc.open_file(pa.OSFile(path))
+        batches = (reader.get_batch(i).select(COLUMNS) for i in range(reader.num_record_batches))
+    for table in _rebatch(batches, chunk_rows):
+        mask = _matches(table, selections)
+        if mask is not None:
+            table = table.filter(mask)
+        yield table.to_pandas().astype(DTYPES)
+
+
+def merge_partials(partials, dimensions):
+    """Combine partial aggregates over the same ``dimensions`` into one."""
+    partials = [partial for partial in partials if len(partial)] or partials[:1]
+    merged = pd.concat(partials, ignore_index=True) if len(partials) > 1 else partials[0]
+    measures = [name for name in merged.columns if name not in dimensions]
+    return merged.groupby(list(dimensions), dropna=False, sort=False)[measures].sum().reset_index()
+
+
+class _Merger:
+    """Running merge of partial aggregates, regrouped once per MERGE_EVERY additions."""
+
+    def __init__(self, dimensions):
+        self.dimensions = list(dimensions)
+        self.partials = []
+
+    def add(self, partial):
+        self.partials.append(partial)
+        if len(self.partials) >= MERGE_EVERY:
+            self.partials = [merge_partials(self.partials, self.dimensions)]
+
+    def result(self):
+        return merge_partials(self.partials, self.dimensions)
+
+
+def _sample(sample, chunk, start, size, rng):
+    # Uniform reservoir sample: every row gets a random key and the rows with
+    # the ``size`` smallest keys seen so far are kept. Only a chunk's own
+    # ``size`` smallest can make it, so the rest are dropped before the merge.
+    keys = rng.random(len(chunk))
+    candidates = np.argpartition(keys, size)[:size] if len(chunk) > size else np.arange(len(chunk))
+    candidates.sort()
+    chunk = chunk.iloc[candidates].assign(**{_POSITION: start + candidates, '_key': keys[candidates]})
+    chunk = plain_categories(chunk)  # chunks have different category lists
+    candidates = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+    return candidates.nsmallest(size, '_key') if len(candidates) > size else candidates
+
+
+def _in_file_order(sample):
+    if sample is None:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in DTYPES.items()})
+    sample = sample.sort_values(_POSITION).drop(columns=[_POSITION, '_key']).reset_index(drop=True)
+    return sample.astype(DTYPES)
+
+
+def filtered_scan(path, chunk_rows, selections, keys, measures, sample_rows=SAMPLE_ROWS, seed=0):
+    """One pass over the rows of ``path`` matching ``selections``.
+
+    Returns (partial, sample): their partial aggregate over ``keys`` and a
+    uniform sample of at most ``sample_rows`` of them, in file order.
+    """
+    rng = np.random.default_rng(seed)
+    merger, sample, rows = _Merger(keys), None, 0
+    for chunk in read_chunks(path, chunk_rows, selections):
+        merger.add(partial_aggregate(chunk, keys, measures))
+        sample = _sample(sample, chunk, rows, sample_rows, rng)
+        rows += len(chunk)
+    return merger.result(), _in_file_order(sample)
+
+
+def scan(path, chunk_rows, sample_rows=SAMPLE_ROWS, seed=0):
+    """Read ``path`` chunk by chunk.
+
+    Returns (cells, options, sample, rows): cube cells over ``CUBE_DIMENSIONS``,
+    the filter options in first-appearance order, a sample of at most
+    ``sample_rows`` rows in file order, and the total row count.
+    """
+    rng = np.random.default_rng(seed)
+    cells, sample, rows = _Merger(CUBE_DIMENSIONS), None, 0
+    options = {dimension: {} for dimension in FILTER_DIMENSIONS}
+    for chunk in read_chunks(path, chunk_rows):
+        cells.add(partial_aggregate(chunk, list(CUBE_DIMENSIONS), list(CUBE_MEASURES)))
+        for dimension, seen in options.items():
+            seen.update(dict.fromkeys(chunk[dimension].dropna().unique().tolist()))
+        sample = _sample(sample, chunk, rows, sample_rows, rng)
+        rows += len(chunk)
+    if not rows:
+        raise ValueError(f'{path} has no rows')
+    return cells.result(), {dimension: list(seen) for dimension, seen in options.items()}, _in_file_order(sample), rows
+
+
+class ChunkedAggregations(AggregationEngine):
+    """Aggregates and rows of an export read in chunks.
+
+    Selections the cube covers are rolled up from it; any other (a company
+    selection) costs one filtered pass over ``path``, which also keeps the
+    rows for its charts. ``frame`` is the global sample; selections it holds
+    too few rows of get theirs from a pass as well. Passes are coalesced and
+    their results memoized, the rows in a smaller LRU of ``row_entries``.
+    """
+
+    def __init__(self, path, chunk_rows, sample, index, cube, aggregations=AGGREGATIONS, max_entries=256,
+                 row_entries=32):
+        super().__init__(sample, index, cube, aggregations, max_entries)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.row_entries = row_entries
+        self._rows = OrderedDict()
+        self._passes = SingleFlight()
+
+    def rows(self, selections):
+        key = filter_key(selections)
+        with self._lock:
+            if key in self._rows:
+                self._rows.move_to_end(key)
+                return self._rows[key]
+        sampled = super().rows(selections)
+        if self.cube.covers(selections, self.aggregations):
+            count = int(self.cube.slice(selections)[ROWS].sum())
+            if len(sampled) >= min(count, STATE_ROWS):
+                return sampled
+        return self._passes.do(key, self._pass, key, selections)[1]
+
+    def _compute(self, selections):
+        if self.cube.covers(selections, self.aggregations):
+            return super()._compute(selections)
+        return self._passes.do(filter_key(selections), self._pass, filter_key(selections), selections)[0]
+
+    def _pass(self, key, selections):
+        partial, rows = filtered_scan(self.path, self.chunk_rows, selections, *grouping(self.aggregations))
+        results = {name: roll_up(partial, spec) for name, spec in self.aggregations.items()}
+        rows = with_row_metrics(rows)
+        self._remember(key, results)
+        with self._lock:
+            self._rows[key] = rows
+            while len(self._rows) > self.row_entries:
+                self._rows.popitem(last=False)
+        return results, rows
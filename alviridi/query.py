@@ -0,0 +1,320 @@
+"""Swappable query engines behind one interface.
+
+An engine answers what the dashboard asks of its data:
+
+* ``options``: the values each sidebar filter offers, in first-appearance order;
+* ``rows(selections)``: the rows matching a filter state;
+* ``compute(selections)``: every roll-up in AGGREGATIONS for that state,
+  shaped exactly as ``alviridi.aggregate.aggregate`` returns them;
+
+plus the ``version`` and ``stats`` of the data behind it.
+
+``PandasEngine`` serves these from the in-memory Dataset. ``SqliteEngine``
+and ``DuckDBEngine`` keep the rows in an embedded database next to the Arrow
+cache, indexed on Fund, Country, Theme and Company Name, and push every
+filter and the grouping pass down as SQL. Their read-only connections come from a
+pool shared by all sessions. DuckDB is optional (``pip install duckdb``).
+
+The SQL engines memoize rows per filter state next to the aggregate memo.
+A state matching more than ``outofcore.SAMPLE_ROWS`` rows gets about that
+many, sampled uniformly as in out-of-core mode: only the row-level charts
+use them, and they plot no more than that.
+
+ALVIRIDI_QUERY_ENGINE picks the engine (pandas, sqlite or duckdb; default
+pandas) and ALVIRIDI_DB_POOL the number of pooled connections (default 4).
+"""
+import abc
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+import pandas as pd
+
+from alviridi import columnar, outofcore
+from alviridi.aggregate import AGGREGATIONS, ROWS, AggregationEngine, grouping, roll_up
+from alviridi.coalesce import SingleFlight
+from alviridi.index import FILTER_DIMENSIONS, filter_key
+from alviridi.instrument import timed
+from alviridi.loader import file_signature, load_dataset
+from alviridi.metrics import ROW_DTYPES, with_row_metrics
+from alviridi.schema import DTYPES, plain_categories
+
+TABLE = 'portfolio'
+INDEXED = ('Fund', 'Country', 'Theme', 'Company Name')
+# The export's columns plus the row-level derived metrics, stored alongside.
+TABLE_DTYPES = {**DTYPES, **ROW_DTYPES}
+SQL_TYPES = {'string': 'TEXT', 'category': 'TEXT', 'int32': 'INTEGER', 'Int32': 'INTEGER', 'float32': 'REAL'}
+BUILD_CHUNK_ROWS = 500_000
+# Rows are sampled by a multiplicative hash of their rowid, so the sample of
+# a filter state is the same on every run and in every process.
+_SPREAD, _BUCKETS = 2654435761, 1_000_000
+
+POOL_SIZE = int(os.environ.get('ALVIRIDI_DB_POOL', 4))
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class PandasEngine:
+    """The in-memory Dataset (alviridi.loader) as a query engine."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.version = dataset.version
+        self.aggregates = dataset.aggregates
+        self.stats = {**dataset.stats, 'engine': 'pandas'}
+        self.options = dataset.index.options
+
+    def rows(self, selections):
+        return self.dataset.aggregates.rows(selections)
+
+    def compute(self, selections):
+        return self.dataset.aggregates.compute(selections)
+
+
+class ConnectionPool:
+    """At most ``size`` connections, opened on demand and reused."""
+
+    def __init__(self, connect, size=POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+
+
+def _where(selections, conditions=()):
+    clauses, params = [], []
+    for dimension, value in selections.items():
+        if value is not None:
+            clauses.append(f'{quote(dimension)} = ?')
+            params.append(value)
+    clauses.extend(conditions)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+
+def _source_tag(signature):
+    # Rebuild when the export or the table's columns change.
+    return f'{signature[1]}-{signature[2]}:' + ','.join(TABLE_DTYPES)
+
+
+def partial_aggregate_sql(keys, measures, selections):
+    """SQL and parameters for ``partial_aggregate`` of the rows matching ``selections``."""
+    keys = [quote(key) for key in keys]
+    # Integer sums come back as integers from both databases (DuckDB widens
+    # SUM(INTEGER) to HUGEINT, which pandas would read as float).
+    sums = [
+        f'CAST(COALESCE(SUM({quote(m)}), 0) AS {"BIGINT" if DTYPES[m] == "int32" else "DOUBLE"}) AS {quote(m)}'
+        for m in measures
+    ]
+    where, params = _where(selections)
+    sql = f'SELECT {", ".join(keys + sums)}, COUNT(*) AS {quote(ROWS)} FROM {TABLE}{where}'
+    if keys:
+        sql += f' GROUP BY {", ".join(keys)}'
+    return sql, params
+
+
+class _SqlAggregations(AggregationEngine):
+    # AggregationEngine's memo, filled from one grouped query per filter state:
+    # the database does the pass over the rows, roll_up the rest.
+
+    def __init__(self, engine, aggregations, max_entries):
+        super().__init__(None, None, aggregations=aggregations, max_entries=max_entries)
+        self.engine = engine
+
+    def _compute(self, selections):
+        partial = self.engine.read(*partial_aggregate_sql(*grouping(self.aggregations), selections))
+        return {name: roll_up(partial, spec) for name, spec in self.aggregations.items()}
+
+
+class SqlEngine(abc.ABC):
+    """Rows in an embedded database; filters and group-bys run as SQL."""
+
+    name = None
+    suffix = None
+
+    def __init__(self, path, aggregations=AGGREGATIONS, pool_size=POOL_SIZE, max_entries=256,
+                 row_entries=32, sample_rows=outofcore.SAMPLE_ROWS):
+        signature = file_signature(path)
+        self.database = columnar.cache_path(path)[:-len('.arrow')] + self.suffix
+        started = time.perf_counter()
+        if self._source(signature) is None:
+            self.build(signature)
+        self.pool = ConnectionPool(self.connect, pool_size)
+        self.version = f'{signature[0]}@{signature[1]}-{signature[2]}'
+        self.options = {
+            dimension: self.read(
+                f'SELECT {quote(dimension)} FROM {TABLE} WHERE {quote(dimension)} IS NOT NULL '
+                f'GROUP BY {quote(dimension)} ORDER BY MIN(rowid)'
+            )[dimension].tolist()
+            for dimension in FILTER_DIMENSIONS
+        }
+        self.aggregates = _SqlAggregations(self, aggregations, max_entries)
+        self.row_entries = row_entries
+        self.sample_rows = sample_rows
+        self._rows = OrderedDict()
+        self._rows_lock = threading.Lock()
+        self._row_flights = SingleFlight()
+        self.stats = {
+            'engine': self.name,
+            'path': signature[0],
+            'rows': int(self.read(f'SELECT COUNT(*) AS n FROM {TABLE}')['n'].iloc[0]),
+            'file_bytes': signature[2],
+            'load_seconds': time.perf_counter() - started,
+            'database': self.database,
+            'database_bytes': os.path.getsize(self.database),
+        }
+
+    def _source(self, signature):
+        # The source signature stored at build time, if the database matches it.
+        if not os.path.exists(self.database):
+            return None
+        with closing(self.connect()) as connection:
+            stored = connection.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        source = _source_tag(signature)
+        return source if stored and stored[0] == source else None
+
+    def build(self, signature):
+        """Load the export into a fresh database, written next to it and renamed into place."""
+        os.makedirs(os.path.dirname(self.database), exist_ok=True)
+        partial = self.database + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        with closing(self.open(partial, read_only=False)) as connection:
+            columns = ', '.join(f'{quote(name)} {SQL_TYPES[dtype]}' for name, dtype in TABLE_DTYPES.items())
+            connection.execute(f'CREATE TABLE {TABLE} ({columns})')
+            for chunk in outofcore.read_chunks(signature[0], BUILD_CHUNK_ROWS):
+                self.insert(connection, plain_categories(with_row_metrics(chunk)))
+            for name in INDEXED:
+                connection.execute(f'CREATE INDEX {quote("by " + name)} ON {TABLE} ({quote(name)})')
+            connection.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            connection.execute("INSERT INTO meta VALUES ('source', ?)", [_source_tag(signature)])
+            connection.commit()
+        os.replace(partial, self.database)
+
+    def connect(self):
+        return self.open(self.database, read_only=True)
+
+    def rows(self, selections):
+        key = filter_key(selections)
+        with self._rows_lock:
+            if key in self._rows:
+                self._rows.move_to_end(key)
+                return self._rows[key]
+        # Sessions asking for the same filter state at once share one query.
+        return self._row_flights.do(key, self._fill_rows, key, selections)
+
+    def _fill_rows(self, key, selections):
+        with self._rows_lock:
+            if key in self._rows:
+                return self._rows[key]
+        rows = self._select_rows(selections)
+        with self._rows_lock:
+            self._rows[key] = rows
+            while len(self._rows) > self.row_entries:
+                self._rows.popitem(last=False)
+        return rows
+
+    def _select_rows(self, selections):
+        where, params = _where(selections)
+        if self.sample_rows:
+            count = int(self.read(f'SELECT COUNT(*) AS n FROM {TABLE}{where}', params)['n'].iloc[0])
+            if count > self.sample_rows:
+                where, params = _where(selections, [f'(rowid * {_SPREAD}) % {_BUCKETS} < ?'])
+                params.append(math.ceil(_BUCKETS * self.sample_rows / count))
+        columns = ', '.join(quote(name) for name in TABLE_DTYPES)
+        return self.read(f'SELECT {columns} FROM {TABLE}{where} ORDER BY rowid', params).astype(TABLE_DTYPES)
+
+    def compute(self, selections):
+        return self.aggregates.compute(selections)
+
+    @abc.abstractmethod
+    def open(self, database, read_only):
+        """A connection to ``database``."""
+
+    @abc.abstractmethod
+    def insert(self, connection, chunk):
+        """Append the rows of the frame ``chunk`` to the table."""
+
+    @abc.abstractmethod
+    def read(self, sql, params=()):
+        """The result of a query, as a frame, on a pooled connection."""
+
+
+class SqliteEngine(SqlEngine):
+    name = 'sqlite'
+    suffix = '.sqlite'
+
+    def open(self, database, read_only):
+        if read_only:
+            return sqlite3.connect(f'file:{database}?mode=ro', uri=True, check_same_thread=False)
+        return sqlite3.connect(database)
+
+    def insert(self, connection, chunk):
+        placeholders = ', '.join('?' * len(chunk.columns))
+        rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False)
+        connection.executemany(f'INSERT INTO {TABLE} VALUES ({placeholders})', rows)
+
+    def read(self, sql, params=()):
+        with self.pool.connection() as connection:
+            return pd.read_sql_query(sql, connection, params=params)
+
+
+class DuckDBEngine(SqlEngine):
+    name = 'duckdb'
+    suffix = '.duckdb'
+
+    def open(self, database, read_only):
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError('the duckdb query engine needs the duckdb package (pip install duckdb)') from None
+        return duckdb.connect(database, read_only=read_only)
+
+    def insert(self, connection, chunk):
+        connection.register('chunk', chunk.astype({name: object for name, dtype in DTYPES.items() if dtype == 'string'}))
+        connection.execute(f'INSERT INTO {TABLE} SELECT * FROM chunk')
+        connection.unregister('chunk')
+
+    def read(self, sql, params=()):
+        with self.pool.connection() as connection:
+            # One cursor per call: a DuckDB connection runs one query at a time.
+            return connection.cursor().execute(sql, params).df()
+
+
+ENGINES = {'sqlite': SqliteEngine, 'duckdb': DuckDBEngine}
+
+_engines = {}
+_lock = threading.Lock()
+
+
+def open_engine(path, name=None):
+    """The query engine ``name`` for the export at ``path``, shared process-wide."""
+    name = name or os.environ.get('ALVIRIDI_QUERY_ENGINE', 'pandas')
+    if name == 'pandas':
+        return PandasEngine(load_dataset(path))
+    if name not in ENGINES:
+        raise ValueError(f'unknown query engine {name!r}; expected pandas, {", ".join(ENGINES)}')
+    signature = file_signature(path)
+    with _lock:
+        cached = _engines.get((signature[0], name))
+        if cached is None or cached[0] != signature:
+            with timed('load'):
+                cached = _engines[signature[0], name] = (signature, ENGINES[name](path))
+        return cached[1]
@@ -0,0 +1,107 @@
+"""Data reduction applied to a chart's frame before it is drawn.
+
+Each chart declares the policies that bound what it draws (see the
+``reduce=`` argument of ``alviridi.charts.chart``); they run in order on the
+frame returned by the chart's data function:
+
+* ``TopN`` keeps the N largest categories of one column and folds the rest
+  into a single "Other" category, so axes and legends stay readable.
+* ``SampleRows`` caps the rows per category that seaborn bootstraps for a
+  raw-row bar chart's mean and confidence interval.
+* ``Binned`` replaces a large scatter with one point per occupied cell of a
+  square grid (per hue), at the mean position of the points in it. The grid
+  is sized so that at most ``max_points`` points are drawn.
+
+Policies leave frames that are already small enough untouched.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from alviridi.specs import Bar, Pie, Scatter
+
+OTHER = 'Other'
+
+
+def _value_column(spec, frame):
+    # The measure categories are ranked by: the numeric axis of a bar chart,
+    # the wedge sizes of a pie. None ranks by row count.
+    if isinstance(spec, Bar):
+        return spec.x if pd.api.types.is_numeric_dtype(frame[spec.x]) else spec.y
+    if isinstance(spec, Pie):
+        return spec.values
+    return None
+
+
+@dataclass(frozen=True)
+class TopN:
+    column: str
+    n: int = 20
+    # 'sum' merges the folded rows of an aggregated frame (one measure, every
+    # other column a key); None only relabels, for raw rows.
+    combine: str = None
+
+    def apply(self, frame, spec):
+        values = _value_column(spec, frame)
+        if values is None:
+            ranking = frame[self.column].value_counts(sort=False)
+        else:
+            ranking = frame.groupby(self.column, sort=False)[values].sum()
+        if len(ranking) <= self.n:
+            return frame
+        keep = ranking.nlargest(self.n).index
+        kept = frame[self.column].isin(keep)
+        other = frame[~kept].assign(**{self.column: OTHER})
+        if self.combine == 'sum':
+            keys = [name for name in frame.columns if name != values]
+            other = other.groupby(keys, sort=False, dropna=False)[values].sum().reset_index()[frame.columns]
+        # "Other" goes last, whatever order the kept categories are in.
+        return pd.concat([frame[kept], other], ignore_index=True)
+
+
+@dataclass(frozen=True)
+class SampleRows:
+    column: str
+    max_rows: int = 1000
+    seed: int = 0  # fixed, so a chart draws the same sample on every render
+
+    def apply(self, frame, spec):
+        if len(frame) <= self.max_rows:
+            return frame
+        order = pd.Series(np.random.default_rng(self.seed).random(len(frame)), index=frame.index)
+        rank = order.groupby(frame[self.column], sort=False).rank(method='first')
+        return frame[rank <= self.max_rows]
+
+
+@dataclass(frozen=True)
+class Binned:
+    max_points: int = 5000
+
+    def apply(self, frame, spec):
+        if len(frame) <= self.max_points:
+            return frame
+        if not isinstance(spec, Scatter):
+            raise TypeError(f'Binned needs a scatter spec, not {type(spec).__name__}')
+        frame = frame.dropna(subset=[spec.x, spec.y])  # seaborn skips these anyway
+        hues = 1 if spec.hue is None else frame[spec.hue].nunique()
+        bins = max(1, int(np.sqrt(self.max_points / hues)))
+        cells = [_cell(frame[spec.x], bins), _cell(frame[spec.y], bins)]
+        keys = ([frame[spec.hue]] if spec.hue is not None else []) + cells
+        points = frame.groupby(keys, sort=False, dropna=False)[[spec.x, spec.y]].mean()
+        points = points.reset_index(level=list(range(len(keys) - 2, len(keys))), drop=True).reset_index()
+        return points[[name for name in frame.columns if name in points]]
+
+
+def _cell(values, bins):
+    low, high = values.min(), values.max()
+    if high == low:
+        return pd.Series(0, index=values.index)
+    cell = ((values - low) / (high - low) * bins).astype('int64')
+    return cell.clip(upper=bins - 1)
+
+
+def apply_policies(frame, spec, policies):
+    for policy in policies:
+        frame = policy.apply(frame, spec)
+    return frame
@@ -0,0 +1,86 @@
+import io
+
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_pdf import PdfPages
+
+from alviridi.figures import borrow
+from alviridi.instrument import timed
+from alviridi.specs import Bar, Pie, Scatter
+
+# Same output options st.pyplot applies.
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight', 'dpi': 200}
+
+
+def _bar_hue(spec, data):
+    # A palette colours the hue levels; without a hue, colour each bar by its
+    # category (the non-numeric axis, else x) and leave the legend out, as
+    # seaborn asks since 0.13. The palette goes in as a list so a numeric
+    # category still gets one colour per bar rather than a colour scale.
+    if spec.hue is not None or spec.palette is None:
+        return {'hue': spec.hue, 'palette': spec.palette}
+    numeric_x = pd.api.types.is_numeric_dtype(data[spec.x]) and not pd.api.types.is_numeric_dtype(data[spec.y])
+    category = spec.y if numeric_x else spec.x
+    palette = sns.color_palette(spec.palette, data[category].nunique())
+    return {'hue': category, 'palette': palette, 'legend': False}
+
+
+def draw(spec, data, figure):
+    """Draw ``spec`` for ``data`` onto the blank ``figure``."""
+    ax = figure.add_subplot()
+    with timed('plot'):
+        if isinstance(spec, Bar):
+            sns.barplot(x=spec.x, y=spec.y, data=data, ax=ax, **_bar_hue(spec, data))
+        elif isinstance(spec, Scatter):
+            extra = {} if spec.size is None else {'s': spec.size}
+            sns.scatterplot(x=spec.x, y=spec.y, hue=spec.hue, data=data, palette=spec.palette, ax=ax, **extra)
+        elif isinstance(spec, Pie):
+            ax.pie(
+                data[spec.values], labels=data[spec.labels], autopct='%1.1f%%', startangle=140,
+                colors=sns.color_palette(spec.palette, len(data)),
+            )
+        else:
+            raise TypeError(f'unsupported chart spec: {type(spec).__name__}')
+    ax.set_title(spec.title)
+    if spec.xlabel is not None:
+        ax.set_xlabel(spec.xlabel)
+    if spec.ylabel is not None:
+        ax.set_ylabel(spec.ylabel)
+    if getattr(spec, 'xtick_rotation', None) is not None:
+        ax.tick_params(axis='x', labelrotation=spec.xtick_rotation)
+    if getattr(spec, 'identity_line', False):
+        ax.axline((0, 0), slope=1, color='red', linestyle='--')  # Add a line for 1:1 ratio
+    if spec.legend is not None:
+        ax.legend(**spec.legend)
+    if isinstance(spec, Pie):
+        ax.axis('equal')  # Equal aspect ratio ensures that pie chart is circular.
+    if spec.tight_layout:
+        with timed('tight_layout'):
+            figure.tight_layout()
+    return figure
+
+
+def render_image(spec, data, fmt='png'):
+    """Encoded image of ``spec`` drawn for ``data``; safe to call from any thread or process."""
+    buffer = io.BytesIO()
+    with borrow(spec.figsize, spec.dpi) as figure:
+        draw(spec, data, figure)
+        with timed('savefig'):
+            figure.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+    return buffer.getvalue()
+
+
+def render_pdf(title, lines, charts):
+    """A PDF with a cover page (``title`` over ``lines`` of text) and one page per (spec, data) chart."""
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        with borrow((8.5, 11)) as figure:
+            figure.text(0.08, 0.92, title, fontsize=16, weight='bold')
+            for i, line in enumerate(lines):
+                figure.text(0.08, 0.85 - i * 0.04, line, fontsize=12)
+            pdf.savefig(figure)
+        for spec, data in charts:
+            with borrow(spec.figsize, spec.dpi) as figure:
+                draw(spec, data, figure)
+                pdf.savefig(figure, bbox_inches='tight')
+    return buffer.getvalue()
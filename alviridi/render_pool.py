@@ -0,0 +1,146 @@
+"""Fan chart rendering out across worker processes.
+
+matplotlib holds the GIL while drawing, so threads cannot render charts in
+parallel. Workers are started once (spawned, so they never inherit the
+server's threads), import matplotlib/seaborn and draw a throwaway chart up
+front, then receive (encode, spec, data) jobs and return the encoded bytes.
+That start-up takes seconds, so the server calls ``start()`` first thing.
+It spawns the workers on the calling thread, which takes milliseconds, and
+returns; they warm up while the server loads the data and sends the
+sidebar and headline metrics, instead of when the first chart is submitted.
+
+ALVIRIDI_RENDER_WORKERS sets the pool size (default: one per CPU); 0 renders
+on a single background thread inside the server process instead.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from alviridi.instrument import METRICS, measured
+
+WORKERS = int(os.environ.get('ALVIRIDI_RENDER_WORKERS', os.cpu_count() or 1))
+
+_executor = None
+_ready = []  # one Future per worker, done once it has warmed up
+_starting = False
+_lock = threading.Lock()
+_started = threading.Condition(_lock)
+
+
+def warm_up():
+    # Importing matplotlib/seaborn and drawing once builds the font cache and
+    # fills matplotlib's internal caches before real jobs arrive.
+    import pandas as pd
+
+    from alviridi.render import render_image
+    from alviridi.specs import Bar
+
+    render_image(Bar(x='value', y='label', title='warm-up'), pd.DataFrame({'label': ['a'], 'value': [1]}))
+
+
+def _start_process_pool(workers):
+    # Streamlit executes app.py as __main__, and spawned children re-import
+    # __main__ by path, so the workers would re-run the whole dashboard. Hide
+    # it while the workers are spawned: each submit spawns one, so all of
+    # them start now, on this thread, and the swap lasts milliseconds. Their
+    # warm-up runs in the children afterwards.
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=warm_up,
+        )
+        ready = [executor.submit(os.getpid) for _ in range(workers)]
+    finally:
+        sys.modules['__main__'] = main
+    return executor, ready
+
+
+def start(workers=None):
+    """Spawn the process-wide executor's workers and return without waiting for them to warm up.
+
+    Call it from the thread that serves the first session, before any chart
+    is submitted; later calls, and calls while another thread is starting
+    the pool, return at once.
+    """
+    global _executor, _ready, _starting
+    with _lock:
+        if _executor is not None or _starting:
+            return
+        _starting = True
+    try:
+        workers = WORKERS if workers is None else workers
+        if workers > 0:
+            executor, ready = _start_process_pool(workers)
+        else:
+            executor, ready = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alviridi-render'), []
+    except BaseException:
+        with _lock:
+            _starting = False
+            _started.notify_all()
+        raise
+    with _lock:
+        _executor, _ready, _starting = executor, ready, False
+        _started.notify_all()
+
+
+def _get_executor(workers=None):
+    # The executor, started if need be; its workers may still be warming up.
+    while True:
+        start(workers)
+        with _lock:
+            while _starting:
+                _started.wait()
+            if _executor is not None:
+                return _executor, _ready
+
+
+def get_executor(workers=None):
+    """The process-wide render executor, started on first use, once its workers have warmed up."""
+    executor, ready = _get_executor(workers)
+    wait(ready)
+    return executor
+
+
+def submit(encode, spec, data, chart=None):
+    """Run ``encode(spec, data)`` in the background; returns a Future of its bytes.
+
+    ``encode`` must be a module-level function so it can be sent to a worker.
+    The stage timings taken while it runs are recorded in the server's
+    ``instrument.METRICS`` under ``chart``.
+    """
+    submitted = time.perf_counter()
+    try:
+        job = _get_executor()[0].submit(measured, encode, spec, data)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool once.
+        shutdown()
+        job = _get_executor()[0].submit(measured, encode, spec, data)
+    future = Future()
+
+    def done(job):
+        if job.cancelled():
+            future.cancel()
+        elif job.exception() is not None:
+            future.set_exception(job.exception())
+        else:
+            payload, samples = job.result()
+            METRICS.merge(samples, chart)
+            METRICS.observe('latency', time.perf_counter() - submitted, chart)
+            future.set_result(payload)
+
+    job.add_done_callback(done)
+    return future
+
+
+def shutdown():
+    global _executor, _ready
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor, _ready = None, []
@@ -0,0 +1,259 @@
+"""Static reports for every Fund x Country filter combination, without Streamlit.
+
+    python -m alviridi.report [data.csv] [-o reports] [--format html|pdf] [--workers N]
+
+Each report holds the dashboard's headline metrics and every chart of every
+tab (the same definitions app.py draws, from alviridi.charts) for one filter
+state: all data, each fund, each country, and each fund in each country
+that has rows. Combinations without rows are skipped.
+
+Aggregates come from the configured query engine (alviridi.query), whose
+memo and cube serve overlapping combinations from the same pre-aggregated
+cells. Charts are drawn in the render pool (alviridi.render_pool), a few
+reports ahead of the one being written. In the HTML bundle, a chart whose
+data is identical to one already drawn (e.g. a fund active in one country
+only) reuses that image. PDF bundles hold one multi-page PDF per report.
+"""
+import argparse
+import functools
+import hashlib
+import html
+import os
+import re
+import sys
+import time
+from collections import deque
+
+import pandas as pd
+
+from alviridi import render_pool
+from alviridi.charts import CHARTS, ChartContext, chart_data, charts_for
+from alviridi.query import open_engine
+from alviridi.render import render_image, render_pdf
+
+FORMATS = ('html', 'pdf')
+
+# Headline metrics, as in the dashboard's metric row: (label, totals key, format).
+METRICS = (
+    ('Fund Size', 'Fund Size ($M)', '${:,.2f}'),
+    ('Investment', 'Investment ($M)', '${:,.2f}'),
+    ('Total Capital Committed ($B)', 'Total Capital Committed ($B)', '${:,.2f}'),
+    ('Fund Investments', 'Fund Investments', '{:,}'),
+    ('Country Capital Catalyzed', 'Country Capital Catalyzed ($M)', '${:,.2f}'),
+    ('Theme Capital Catalyzed', 'Theme Capital Catalyzed ($M)', '${:,.2f}'),
+)
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2em; }}
+.metrics {{ display: flex; gap: 2em; flex-wrap: wrap; }}
+.metric b {{ display: block; font-size: 1.4em; }}
+img {{ max-width: 100%; display: block; margin: 1em 0; }}
+td, th {{ padding: 0.3em 0.8em; text-align: left; }}
+</style></head>
+<body>
+{body}
+</body></html>
+"""
+
+
+def tab_titles():
+    return list(dict.fromkeys(chart.tab for chart in CHARTS.values()))
+
+
+def combinations(options):
+    """Every (fund, country) filter pair, with None for 'all'."""
+    return [(fund, country) for fund in [None] + options['Fund'] for country in [None] + options['Country']]
+
+
+def slug(fund, country):
+    parts = fund or 'all funds', country or 'all countries'
+    return '__'.join(re.sub(r'[^a-z0-9]+', '-', part.lower()).strip('-') for part in parts)
+
+
+def heading(fund, country):
+    return f'Analyzing: All Companies in {country or "All Countries"} for {fund or "All Funds"}'
+
+
+def metric_values(totals):
+    return [(label, fmt.format(totals[key])) for label, key, fmt in METRICS]
+
+
+def digest(chart, data):
+    # Charts with the same id and data draw the same image.
+    values = pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+    return hashlib.sha1(chart.id.encode() + repr(list(data.columns)).encode() + values).hexdigest()
+
+
+class HtmlBundle:
+    """index.html, one page per report and a shared images/ directory."""
+
+    def __init__(self, output, image_format='png'):
+        self.output = output
+        self.image_format = image_format
+        self.encode = functools.partial(render_image, fmt=image_format)
+        self._images = {}  # digest -> Future, until written
+        self._written = set()
+        self.rendered = self.shared = 0
+        os.makedirs(os.path.join(output, 'images'), exist_ok=True)
+
+    def submit(self, report):
+        keys = {}
+        for chart, data in report['charts']:
+            key = digest(chart, data)
+            if key in self._written or key in self._images:
+                self.shared += 1
+            else:
+                self._images[key] = render_pool.submit(self.encode, chart.spec, data, chart.id)
+                self.rendered += 1
+            keys[chart.id] = key
+        return keys
+
+    def write(self, report, keys):
+        sections = []
+        for title in tab_titles():
+            images = []
+            for chart in charts_for(title):
+                if chart.id not in keys:
+                    continue
+                key = keys[chart.id]
+                path = f'images/{key}.{self.image_format}'
+                if key not in self._written:
+                    with open(os.path.join(self.output, path), 'wb') as file:
+                        file.write(self._images.pop(key).result())
+                    self._written.add(key)
+                images.append(f'<img src="{path}" alt="{html.escape(chart.spec.title)}">')
+            sections.append(f'<h2>{html.escape(title)}</h2>\n' + '\n'.join(images))
+        metrics = ''.join(
+            f'<div class="metric">{html.escape(label)}<b>{html.escape(value)}</b></div>'
+            for label, value in report['metrics']
+        )
+        body = (
+            f'<p><a href="index.html">All reports</a></p>\n<h1>{html.escape(report["title"])}</h1>\n'
+            f'<div class="metrics">{metrics}</div>\n' + '\n'.join(sections)
+        )
+        with open(os.path.join(self.output, report['name'] + '.html'), 'w', encoding='utf-8') as file:
+            file.write(PAGE.format(title=html.escape(report['title']), body=body))
+
+    def finish(self, reports, options):
+        written = {(report['fund'], report['country']): report['name'] for report in reports}
+        header = ''.join(f'<th>{html.escape(country or "All Countries")}</th>' for country in [None] + options['Country'])
+        rows = []
+        for fund in [None] + options['Fund']:
+            cells = []
+            for country in [None] + options['Country']:
+                name = written.get((fund, country))
+                cells.append(f'<td><a href="{name}.html">view</a></td>' if name else '<td>&mdash;</td>')
+            rows.append(f'<tr><th>{html.escape(fund or "All Funds")}</th>{"".join(cells)}</tr>')
+        body = f'<h1>Portfolio reports</h1>\n<table><tr><th></th>{header}</tr>\n' + '\n'.join(rows) + '\n</table>'
+        with open(os.path.join(self.output, 'index.html'), 'w', encoding='utf-8') as file:
+            file.write(PAGE.format(title='Portfolio reports', body=body))
+
+
+class PdfBundle:
+    """One PDF per report, drawn whole by a render worker."""
+
+    def __init__(self, output):
+        self.output = output
+        self.rendered = self.shared = 0
+        os.makedirs(output, exist_ok=True)
+
+    def submit(self, report):
+        charts = [(chart.spec, data) for chart, data in report['charts']]
+        self.rendered += len(charts)
+        lines = [f'{label}: {value}' for label, value in report['metrics']]
+        return render_pool.get_executor().submit(render_pdf, report['title'], lines, charts)
+
+    def write(self, report, future):
+        with open(os.path.join(self.output, report['name'] + '.pdf'), 'wb') as file:
+            file.write(future.result())
+
+    def finish(self, reports, options):
+        pass
+
+
+def prepare(engine, fund, country):
+    """Everything a report needs except the drawn charts, or None if it has no rows."""
+    selections = {'Company Name': None, 'Country': country, 'Fund': fund}
+    rows = engine.rows(selections)
+    if not len(rows):
+        return None
+    context = ChartContext(rows=rows, aggregates=engine.compute(selections), selections=selections, version=engine.version)
+    return {
+        'name': slug(fund, country),
+        'fund': fund,
+        'country': country,
+        'title': heading(fund, country),
+        'metrics': metric_values(context.aggregates['totals']),
+        'charts': [(chart, chart_data(chart, context)) for chart in CHARTS.values()],
+    }
+
+
+def generate(path, output, fmt='html', image_format='png', ahead=None, progress=print):
+    """Write the report bundle for ``path`` to ``output``; returns a summary dict."""
+    started = time.perf_counter()
+    engine = open_engine(path)
+    bundle = HtmlBundle(output, image_format) if fmt == 'html' else PdfBundle(output)
+    ahead = ahead or 2 * max(render_pool.WORKERS, 1)
+    pairs = combinations(engine.options)
+    reports, queued, skipped = [], deque(), 0
+
+    def write_oldest():
+        report, handle = queued.popleft()
+        bundle.write(report, handle)
+        report['charts'] = None  # drop the chart data once drawn
+        reports.append(report)
+        rate = len(reports) / (time.perf_counter() - started) * 60
+        progress(f'[{len(reports) + skipped}/{len(pairs)}] {report["name"]} ({rate:,.1f} reports/min)')
+
+    for fund, country in pairs:
+        report = prepare(engine, fund, country)
+        if report is None:
+            skipped += 1
+            continue
+        queued.append((report, bundle.submit(report)))
+        if len(queued) > ahead:
+            write_oldest()
+    while queued:
+        write_oldest()
+    bundle.finish(reports, engine.options)
+    elapsed = time.perf_counter() - started
+    return {
+        'reports': len(reports),
+        'skipped': skipped,
+        'charts_rendered': bundle.rendered,
+        'charts_shared': bundle.shared,
+        'seconds': elapsed,
+        'reports_per_minute': len(reports) / elapsed * 60,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write static reports for every Fund x Country combination.')
+    parser.add_argument('data', nargs='?', default=os.environ.get('ALVIRIDI_DATA', 'dummy_sample.csv'))
+    parser.add_argument('-o', '--output', default='reports', help='bundle directory (default: reports)')
+    parser.add_argument('--format', choices=FORMATS, default='html')
+    parser.add_argument('--image-format', choices=('png', 'svg'), default='png', help='chart images in HTML bundles')
+    parser.add_argument('--workers', type=int, help='render processes (default: ALVIRIDI_RENDER_WORKERS or one per CPU)')
+    args = parser.parse_args(argv)
+
+    if args.workers is not None:
+        render_pool.get_executor(args.workers)
+    try:
+        summary = generate(
+            args.data, args.output, args.format, args.image_format,
+            ahead=None if args.workers is None else 2 * max(args.workers, 1),
+            progress=lambda line: print(line, file=sys.stderr, flush=True),
+        )
+    finally:
+        render_pool.shutdown()
+    print(
+        f'Wrote {summary["reports"]} reports to {args.output} in {summary["seconds"]:.1f}s '
+        f'({summary["reports_per_minute"]:,.1f} reports/min); {summary["skipped"]} empty combinations skipped, '
+        f'{summary["charts_rendered"]} charts drawn, {summary["charts_shared"]} shared'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import pandas as pd
+
+# Explicit, compact dtypes for the portfolio export. Low-cardinality text
+# columns become categoricals; money, count and emissions columns are narrowed
+# to 32-bit. pandas widens int32 to int64 when summing, so integer totals do
+# not overflow; float32 sums stay float32, so the aggregation code widens
+# float measures itself (alviridi.aggregate.partial_aggregate). Global South
+# Countries Supported is left blank for companies outside the Global South,
+# so it is a nullable Int32.
+CATEGORY_COLUMNS = ['Company Name', 'Fund', 'Country', 'Theme']
+
+DTYPES = {
+    'Company ID': 'string',
+    'Company Name': 'category',
+    'Fund': 'category',
+    'Investment ($M)': 'int32',
+    'Fund Size ($M)': 'int32',
+    'Total Capital Committed ($B)': 'float32',
+    'Fund Investments': 'int32',
+    'Global South Deals Funded': 'int32',
+    'Global South Countries Supported': 'Int32',
+    'Country': 'category',
+    'Country Capital Catalyzed ($M)': 'int32',
+    'Theme': 'category',
+    'Theme Capital Catalyzed ($M)': 'int32',
+    'Total Emissions by Fund (tons of CO2e)': 'int32',
+    'Scope 1 Emissions (tons of CO2e)': 'int32',
+    'Scope 2 Emissions (tons of CO2e)': 'int32',
+    'Scope 3 Emissions (tons of CO2e)': 'int32',
+}
+
+COLUMNS = list(DTYPES)
+
+
+def plain_categories(frame):
+    # seaborn orders a categorical axis by its full category list (including
+    # values filtered out of this frame), so plotted frames use plain labels.
+    # Nullable integers become NumPy ones (float64 if any are missing), which
+    # plotting and JSON encoding handle like the rest of the frame.
+    plain = {}
+    for name, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            plain[name] = object
+        elif isinstance(dtype, pd.Int32Dtype):
+            plain[name] = 'float64' if frame[name].hasnans else 'int64'
+    return frame.astype(plain)
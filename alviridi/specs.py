@@ -0,0 +1,46 @@
+"""Declarative chart specs: what to draw, independent of how it is drawn.
+
+A spec plus the chart's (already aggregated) data frame fully determines the
+output, so rendering is a pure function that can run in any process.
+"""
+from dataclasses import dataclass
+
+# ax.legend() placement shared by most charts: outside the axes, top right.
+LEGEND_OUTSIDE = {'bbox_to_anchor': (1.05, 1), 'loc': 'upper left'}
+
+
+@dataclass(frozen=True, kw_only=True)
+class ChartSpec:
+    title: str
+    xlabel: str = None
+    ylabel: str = None
+    figsize: tuple = (12, 6)
+    dpi: int = None
+    tight_layout: bool = True
+    legend: dict = None  # ax.legend() keyword arguments; None keeps the default legend
+
+
+@dataclass(frozen=True, kw_only=True)
+class Bar(ChartSpec):
+    x: str
+    y: str
+    hue: str = None
+    palette: str = None
+    xtick_rotation: int = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class Scatter(ChartSpec):
+    x: str
+    y: str
+    hue: str = None
+    palette: str = None
+    size: int = None
+    identity_line: bool = False  # dashed y = x reference line
+
+
+@dataclass(frozen=True, kw_only=True)
+class Pie(ChartSpec):
+    values: str
+    labels: str
+    palette: str = None
@@ -0,0 +1,171 @@
+"""Renderers for the dashboard's analysis tabs.
+
+Each tab is registered with ``@tab(title)``; app.py only runs the renderer of
+the tab that is open. Charts are encoded by the deployment's chart backend
+(alviridi.backends) and kept in the process-wide figure cache; misses are
+encoded in the render pool (alviridi.render_pool) or inline, depending on
+the backend, and shown as each one finishes. The other tabs can be
+prefetched into the cache.
+
+Prefetching is background work at the lowest priority. One thread prepares
+and renders the prefetched charts one at a time, so the visible tab's
+renders queue behind at most one prefetch job. A visible tab being shown,
+or a newer prefetch (the user changed the filter), drops whatever the
+older prefetch has not started yet.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+
+import streamlit as st
+
+from alviridi import render_pool
+from alviridi.backends import get_backend
+from alviridi.charts import chart_data, charts_for
+from alviridi.figcache import FIGURES
+from alviridi.index import filter_key
+from alviridi.instrument import METRICS, measured
+
+BACKEND = get_backend()
+
+# Tab title -> renderer, in display order.
+TABS = {}
+
+# Figure key -> Future for renders in progress, so a chart requested again
+# (by a prefetch or another session) waits for the same job instead of
+# preparing its data and encoding it again.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+_prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alviridi-prefetch')
+_prefetch_generation = 0  # bumped to drop the prefetch work queued so far
+
+
+def tab(title):
+    def register(render):
+        TABS[title] = render
+        return render
+    return register
+
+
+def figure_key(chart, context):
+    return chart.id, filter_key(context.selections), context.version, BACKEND.format
+
+
+def _encode_inline(chart, context):
+    payload, samples = measured(BACKEND.encode, chart.spec, chart_data(chart, context))
+    METRICS.merge(samples, chart.id)
+    return payload
+
+
+def _chain(future, job):
+    if job.cancelled():
+        future.cancel()
+    elif job.exception() is not None:
+        future.set_exception(job.exception())
+    else:
+        future.set_result(job.result())
+
+
+def _store(key, future):
+    with _inflight_lock:
+        _inflight.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        FIGURES.put(key, future.result())
+
+
+def render_async(chart, context, key):
+    """A Future of ``chart``'s payload for ``context``, encoded once however many sessions ask."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _inflight[key] = Future()
+    future.add_done_callback(partial(_store, key))
+    try:
+        if BACKEND.pooled:
+            job = render_pool.submit(BACKEND.encode, chart.spec, chart_data(chart, context), chart.id)
+            job.add_done_callback(partial(_chain, future))
+        else:
+            future.set_result(_encode_inline(chart, context))
+    except Exception as error:
+        future.set_exception(error)
+    return future
+
+
+def _supersede_prefetch():
+    global _prefetch_generation
+    with _inflight_lock:
+        _prefetch_generation += 1
+        return _prefetch_generation
+
+
+def show_charts(context, title):
+    """Show the tab's charts, filling each slot as soon as its image is ready."""
+    _supersede_prefetch()
+    pending = {}
+    for chart in charts_for(title):
+        slot = st.empty()
+        key = figure_key(chart, context)
+        image = FIGURES.get(key)
+        if image is None:
+            pending[render_async(chart, context, key)] = slot
+        else:
+            BACKEND.show(slot, image)
+    for future in as_completed(pending):
+        BACKEND.show(pending[future], future.result())
+
+
+def prefetch(context, titles):
+    """Render the charts of ``titles`` into the figure cache in the background; returns at once."""
+    charts = [chart for title in titles for chart in charts_for(title)]
+    _prefetcher.submit(_prefetch, context, charts, _supersede_prefetch())
+
+
+def _prefetch(context, charts, generation):
+    for chart in charts:
+        if generation != _prefetch_generation:
+            return
+        key = figure_key(chart, context)
+        if key not in FIGURES:
+            # Waiting keeps a single prefetch job in the render pool's queue.
+            wait([render_async(chart, context, key)])
+
+
+@tab('Investment Analysis')
+def investment(context):
+    st.title('Investment Analysis')
+    show_charts(context, 'Investment Analysis')
+
+
+@tab('Geographic Impact Analysis')
+def geographic(context):
+    st.write("### Geographic Impact Analysis")
+    show_charts(context, 'Geographic Impact Analysis')
+
+
+@tab('Thematic Analysis')
+def thematic(context):
+    st.title('Thematic Analysis')
+    show_charts(context, 'Thematic Analysis')
+
+
+@tab('Environmental Impact Analysis')
+def environmental(context):
+    st.title('Environmental Impact Analysis')
+    show_charts(context, 'Environmental Impact Analysis')
+
+
+@tab('Global South Investment Focus')
+def global_south(context):
+    st.title('Global South Investment Focus')
+    # 1. How much funding is flowing into Global South regions?
+    total_investment = context.aggregates['totals']['Investment ($M)']
+    st.write(f'Total Investment in Global South: ${total_investment:.2f}M')
+    show_charts(context, 'Global South Investment Focus')
+
+
+@tab('Fund Performance Comparison')
+def fund_performance(context):
+    st.title('Fund Performance Analysis')
+    show_charts(context, 'Fund Performance Comparison')
@@ -0,0 +1,138 @@
+"""Vega-Lite versions of the chart specs, drawn by the browser.
+
+``to_vega_lite`` turns a spec plus its (reduced) frame into a self-contained
+Vega-Lite document: the data is inlined and already aggregated, so the
+browser only lays out marks. Colours come from the same seaborn palettes the
+matplotlib renderer uses.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from alviridi.instrument import timed
+from alviridi.specs import Bar, Pie, Scatter
+
+SCHEMA = 'https://vega.github.io/schema/vega-lite/v5.json'
+
+# Pixels per inch of matplotlib figure height.
+HEIGHT_SCALE = 50
+
+LOWER, UPPER = 'ci_lower', 'ci_upper'
+
+
+def _records(frame):
+    # to_json writes numpy scalars natively and missing values as null.
+    return json.loads(frame.to_json(orient='records'))
+
+
+def _colors(spec, domain):
+    domain = pd.Series(domain).tolist()  # native Python values, for json
+    return {'domain': domain, 'range': sns.color_palette(spec.palette, len(domain)).as_hex()}
+
+
+def _bar_values(frame, value, keys):
+    # seaborn draws the mean of each category with a 95% bootstrap interval;
+    # ship the mean and a normal-approximation interval instead of the rows.
+    grouped = frame.groupby(keys, sort=False, dropna=False)[value]
+    summary = grouped.agg(['mean', 'std', 'count'])
+    half_width = 1.96 * summary['std'] / np.sqrt(summary['count'])
+    return pd.DataFrame({
+        value: summary['mean'], LOWER: summary['mean'] - half_width, UPPER: summary['mean'] + half_width,
+    }).reset_index()
+
+
+def _bar(spec, frame):
+    horizontal = pd.api.types.is_numeric_dtype(frame[spec.x])
+    value, category = (spec.x, spec.y) if horizontal else (spec.y, spec.x)
+    value_axis, category_axis = ('x', 'y') if horizontal else ('y', 'x')
+    keys = [category] + ([spec.hue] if spec.hue is not None else [])
+    values = _bar_values(frame, value, keys)
+    colour = spec.hue or category
+    labels = {value: spec.xlabel if horizontal else spec.ylabel, category: spec.ylabel if horizontal else spec.xlabel}
+    encoding = {
+        category_axis: {'field': category, 'type': 'nominal', 'sort': None, 'title': labels[category]},
+        value_axis: {'field': value, 'type': 'quantitative', 'title': labels[value]},
+        'color': {
+            'field': colour, 'type': 'nominal', 'scale': _colors(spec, values[colour].unique()),
+            'legend': None if spec.hue is None else {'title': spec.hue},
+        },
+    }
+    if spec.hue is not None:
+        encoding[f'{category_axis}Offset'] = {'field': spec.hue, 'sort': None}
+    if spec.xtick_rotation is not None and not horizontal:
+        encoding['x']['axis'] = {'labelAngle': -spec.xtick_rotation}
+    error = {
+        value_axis: {'field': LOWER, 'type': 'quantitative'}, f'{value_axis}2': {'field': UPPER},
+        category_axis: encoding[category_axis],
+    }
+    if spec.hue is not None:
+        error[f'{category_axis}Offset'] = encoding[f'{category_axis}Offset']
+    return values, {'layer': [
+        {'mark': 'bar', 'encoding': encoding},
+        {'mark': {'type': 'rule', 'color': '#404040'}, 'encoding': error},
+    ]}
+
+
+def _scatter(spec, frame):
+    encoding = {
+        'x': {'field': spec.x, 'type': 'quantitative', 'title': spec.xlabel or spec.x},
+        'y': {'field': spec.y, 'type': 'quantitative', 'title': spec.ylabel or spec.y},
+        'tooltip': [{'field': name} for name in frame.columns],
+    }
+    if spec.hue is not None:
+        encoding['color'] = {'field': spec.hue, 'type': 'nominal', 'scale': _colors(spec, frame[spec.hue].unique())}
+    mark = {'type': 'point', 'filled': True}
+    if spec.size is not None:
+        mark['size'] = spec.size
+    layers = [{'mark': mark, 'encoding': encoding}]
+    if spec.identity_line:
+        end = float(max(frame[spec.x].max(), frame[spec.y].max(), 0)) if len(frame) else 1.0
+        layers.append({
+            'data': {'values': [{spec.x: 0, spec.y: 0}, {spec.x: end, spec.y: end}]},
+            'mark': {'type': 'line', 'color': 'red', 'strokeDash': [6, 4]},
+            'encoding': {'x': {'field': spec.x, 'type': 'quantitative'}, 'y': {'field': spec.y, 'type': 'quantitative'}},
+        })
+    return frame, {'layer': layers}
+
+
+def _pie(spec, frame):
+    theta = {'field': spec.values, 'type': 'quantitative', 'stack': True}
+    color = {'field': spec.labels, 'type': 'nominal', 'sort': None, 'scale': _colors(spec, frame[spec.labels])}
+    return frame, {
+        'transform': [
+            {'joinaggregate': [{'op': 'sum', 'field': spec.values, 'as': 'total'}]},
+            {'calculate': f'datum[{json.dumps(spec.values)}] / datum.total', 'as': 'share'},
+        ],
+        'encoding': {'theta': theta, 'color': color},
+        'layer': [
+            {'mark': {'type': 'arc', 'outerRadius': 120}},
+            {'mark': {'type': 'text', 'radius': 80}, 'encoding': {'text': {'field': 'share', 'format': '.1%'}}},
+        ],
+    }
+
+
+def to_vega_lite(spec, data):
+    """A Vega-Lite document drawing ``spec`` for ``data``."""
+    if isinstance(spec, Bar):
+        values, body = _bar(spec, data)
+    elif isinstance(spec, Scatter):
+        values, body = _scatter(spec, data)
+    elif isinstance(spec, Pie):
+        values, body = _pie(spec, data)
+    else:
+        raise TypeError(f'unsupported chart spec: {type(spec).__name__}')
+    return {
+        '$schema': SCHEMA,
+        'title': spec.title,
+        'height': spec.figsize[1] * HEIGHT_SCALE,
+        'data': {'values': _records(values)},
+        **body,
+    }
+
+
+def render_json(spec, data):
+    """``to_vega_lite`` encoded as UTF-8 JSON bytes, for the figure cache."""
+    with timed('vega_lite'):
+        return json.dumps(to_vega_lite(spec, data)).encode()
@@ -0,0 +1,87 @@
+"""Warm a freshly deployed instance before it takes traffic.
+
+    python -m alviridi.warmup [data.csv]
+
+Run it where the server runs (same working directory and environment), so
+it finds and fills the same caches:
+
+* fonts: matplotlib's font cache, which the first import in a new container
+  otherwise builds by scanning every system font;
+* data: the Arrow copy of the CSV (alviridi.columnar), or the SQLite/DuckDB
+  database of those query engines;
+* view: every chart of the default All Companies / All Countries / All
+  Funds view, encoded by the deployment's chart backend. With
+  ALVIRIDI_FIGURE_CACHE_DIR set, the images are written there and the
+  server's figure cache reads them back on its first request.
+"""
+import argparse
+import os
+import sys
+import time
+
+from alviridi import render_pool
+from alviridi.charts import CHARTS, ChartContext
+from alviridi.figcache import FIGURES
+from alviridi.query import open_engine
+from alviridi.tabs import figure_key, render_async
+
+DEFAULT_VIEW = {'Company Name': None, 'Country': None, 'Fund': None}
+
+
+def warm_fonts():
+    render_pool.warm_up()
+
+
+def warm_view(engine):
+    """Encode the default view's charts into the figure cache; returns how many were written to disk."""
+    context = ChartContext(
+        rows=engine.rows(DEFAULT_VIEW), aggregates=engine.compute(DEFAULT_VIEW), selections=DEFAULT_VIEW,
+        version=engine.version,
+    )
+    pending = {}
+    for chart in CHARTS.values():
+        key = figure_key(chart, context)
+        if key not in FIGURES:
+            pending[key] = render_async(chart, context, key)
+    for key, future in pending.items():
+        FIGURES.put(key, future.result())
+    return FIGURES.flush()
+
+
+def warm(path, progress=print):
+    """Run every warm-up step for ``path``; returns {step: seconds}."""
+    timings = {}
+    started = time.perf_counter()
+    warm_fonts()
+    timings['fonts'] = time.perf_counter() - started
+    progress(f'fonts: {timings["fonts"]:.1f}s')
+
+    started = time.perf_counter()
+    engine = open_engine(path)
+    timings['data'] = time.perf_counter() - started
+    progress(f'data: {timings["data"]:.1f}s ({engine.stats["rows"]:,} rows, {engine.stats["engine"]} engine)')
+
+    started = time.perf_counter()
+    written = warm_view(engine)
+    timings['view'] = time.perf_counter() - started
+    where = f'{written} images written to {FIGURES.spill_dir}' if FIGURES.spill_dir else (
+        'not kept; set ALVIRIDI_FIGURE_CACHE_DIR to share them with the server'
+    )
+    progress(f'view: {timings["view"]:.1f}s ({len(CHARTS)} charts, {where})')
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the font, data and figure caches a fresh instance needs.')
+    parser.add_argument('data', nargs='?', default=os.environ.get('ALVIRIDI_DATA', 'dummy_sample.csv'))
+    args = parser.parse_args(argv)
+
+    try:
+        timings = warm(args.data, progress=lambda line: print(line, file=sys.stderr, flush=True))
+    finally:
+        render_pool.shutdown()
+    print(f'Warmed {args.data} in {sum(timings.values()):.1f}s')
+
+
+if __name__ == '__main__':
+    main()
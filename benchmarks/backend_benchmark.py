@@ -0,0 +1,58 @@
+"""Server CPU and payload per page view for each chart backend.
+
+    python benchmarks/backend_benchmark.py [data.csv] [--views 30]
+
+A page view is one analysis tab opened for one filter state with a cold
+figure cache: every chart's data is prepared and encoded by the backend in
+this process. Views cycle through the tabs and through the unfiltered view
+and each single-country filter. CPU is process time, so it counts the work
+the server does and nothing the browser does.
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alviridi.backends import BACKENDS  # noqa: E402
+from alviridi.charts import ChartContext, chart_data, charts_for  # noqa: E402
+from alviridi.loader import load_dataset  # noqa: E402
+from alviridi.tabs import TABS  # noqa: E402
+
+
+def page_views(dataset, count):
+    filters = [{}] + [{'Country': country} for country in dataset.index.options['Country']]
+    for title, selections in itertools.islice(itertools.cycle(itertools.product(TABS, filters)), count):
+        context = ChartContext(dataset.aggregates.rows(selections), dataset.aggregates.compute(selections),
+                               selections, dataset.version)
+        yield title, context
+
+
+def measure(backend, dataset, views):
+    cpu = payload = 0
+    for title, context in page_views(dataset, views):
+        started = time.process_time()
+        for chart in charts_for(title):
+            payload += len(backend.encode(chart.spec, chart_data(chart, context)))
+        cpu += time.process_time() - started
+    return cpu / views, payload / views
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default='dummy_sample.csv')
+    parser.add_argument('--views', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    dataset = load_dataset(args.data)
+    print(f'{"backend":<12} {"CPU ms/view":>12} {"KB/view":>10}')
+    for backend in BACKENDS.values():
+        measure(backend, dataset, 1)  # imports and font caches
+        cpu, payload = measure(backend, dataset, args.views)
+        print(f'{backend.name:<12} {cpu * 1000:>12.1f} {payload / 1024:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Time and peak memory of each stage of the dashboard's pipeline, at several data sizes.
+
+    python benchmarks/pipeline_benchmark.py [--rows 10k,1m,10m] [-o results.json] [--compare baseline.json]
+
+For each size, a synthetic export (benchmarks/synthetic.py) is generated
+once into .alviridi_cache/synthetic/. The work app.py does is then replayed
+headlessly in a fresh process, so memory figures do not carry over between
+sizes:
+
+* convert: the CSV to the Arrow cache, always rebuilt;
+* load: opening the query engine (ALVIRIDI_QUERY_ENGINE, default pandas);
+* filter: the rows of each filter state;
+* aggregate: the aggregates of each filter state, memo cold;
+* chart_data: every chart's frame for each filter state;
+* render: every chart drawn and encoded as PNG, for the first
+  ``--render-states`` filter states.
+
+The engine and loading mode come from the environment as in app.py
+(ALVIRIDI_QUERY_ENGINE, ALVIRIDI_CHUNK_ROWS), so e.g. a 10m run that does
+not fit in memory can be repeated out of core. A size whose process fails
+(typically killed for memory) is recorded with its error and skipped.
+
+The filter states are all data, each country, each fund and the first five
+companies. Each stage records its wall time, how often it ran, and the
+process's peak RSS after it. Peak RSS is a high-water mark, so a stage's
+``peak_growth_mb`` is the memory it needed beyond everything before it.
+The render stage also gets the plot / tight_layout / savefig split from
+alviridi.instrument.
+
+Results are written as JSON together with the commit and the machine.
+``--compare`` prints each stage's time against an earlier results file and
+exits non-zero if any stage got slower by more than ``--tolerance``.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, '.alviridi_cache', 'synthetic')
+RESULTS_DIR = os.path.join(ROOT, '.alviridi_cache', 'benchmarks')
+STAGES = ('convert', 'load', 'filter', 'aggregate', 'chart_data', 'render')
+COMPANY_STATES = 5
+
+
+def filter_states(options):
+    states = [{'Company Name': None, 'Country': None, 'Fund': None}]
+    states += [{'Company Name': None, 'Country': country, 'Fund': None} for country in options['Country']]
+    states += [{'Company Name': None, 'Country': None, 'Fund': fund} for fund in options['Fund']]
+    states += [{'Company Name': company, 'Country': None, 'Fund': None} for company in options['Company Name'][:COMPANY_STATES]]
+    return states
+
+
+def run_pipeline(path, render_states):
+    """Replay the pipeline on ``path`` in this process; returns its results dict."""
+    from alviridi import columnar
+    from alviridi.charts import CHARTS, ChartContext, chart_data
+    from alviridi.instrument import METRICS, measured, peak_rss
+    from alviridi.query import open_engine
+    from alviridi.render import render_image
+
+    stages = {name: {'seconds': 0.0, 'calls': 0, 'peak_rss_mb': 0.0, 'peak_growth_mb': 0.0} for name in STAGES}
+
+    @contextmanager
+    def stage(name):
+        before = peak_rss() or 0
+        started = time.perf_counter()
+        yield
+        entry = stages[name]
+        entry['seconds'] += time.perf_counter() - started
+        entry['calls'] += 1
+        after = peak_rss() or 0
+        entry['peak_rss_mb'] = after / 1e6
+        entry['peak_growth_mb'] += (after - before) / 1e6
+
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with stage('convert'):
+            columnar.convert(path, columnar.cache_path(path))
+    with stage('load'):
+        engine = open_engine(path)
+    states = filter_states(engine.options)
+    METRICS.reset()
+    for i, selections in enumerate(states):
+        with stage('filter'):
+            rows = engine.rows(selections)
+        with stage('aggregate'):
+            aggregates = engine.compute(selections)
+        context = ChartContext(rows=rows, aggregates=aggregates, selections=selections, version=engine.version)
+        # One chart's frame at a time, as a render worker would hold it.
+        for chart in CHARTS.values():
+            with stage('chart_data'):
+                data = chart_data(chart, context)
+            if i < render_states:
+                with stage('render'):
+                    _, samples = measured(render_image, chart.spec, data)
+                    METRICS.merge(samples, chart.id)
+            del data
+        del rows, context
+    breakdown = {
+        row['stage']: {'calls': row['count'], 'mean_ms': row['mean ms'], 'max_ms': row['max ms']}
+        for row in METRICS.summary()[0] if row['stage'] in ('plot', 'tight_layout', 'savefig', 'render')
+    }
+    return {
+        'rows': engine.stats['rows'],
+        'file_mb': os.path.getsize(path) / 1e6,
+        'filter_states': len(states),
+        'stages': stages,
+        'render_breakdown': breakdown,
+    }
+
+
+def commit():
+    try:
+        head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return head.stdout.strip(), bool(status.stdout.strip())
+
+
+def compare(results, baseline, tolerance):
+    """Print stage times against ``baseline``; returns the number of regressions."""
+    previous = {run['rows']: run for run in baseline['runs'] if 'error' not in run}
+    regressions = 0
+    print(f'\nagainst {str(baseline.get("commit"))[:10]}:')
+    print(f'{"rows":>12} {"stage":<11} {"before s":>9} {"after s":>9} {"ratio":>7}')
+    for run in results['runs']:
+        if 'error' in run or run['rows'] not in previous:
+            continue
+        for name in STAGES:
+            before, after = previous[run['rows']]['stages'][name]['seconds'], run['stages'][name]['seconds']
+            if not before:
+                continue
+            ratio = after / before
+            # Sub-50 ms stages are too noisy to call regressions.
+            slower = ratio > 1 + tolerance and after - before > 0.05
+            regressions += slower
+            print(f'{run["rows"]:>12,} {name:<11} {before:>9.3f} {after:>9.3f} {ratio:>6.2f}x' + ('  SLOWER' if slower else ''))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10k,1m,10m', help='comma-separated sizes (default: 10k,1m,10m)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render-states', type=int, default=2, help='filter states whose charts are rendered')
+    parser.add_argument('-o', '--output', help=f'results file (default: {RESULTS_DIR}/pipeline-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown per stage (default: 0.2)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        json.dump(run_pipeline(args.child, args.render_states), sys.stdout)
+        return
+
+    revision, dirty = commit()
+    results = {
+        'commit': revision,
+        'dirty': dirty,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'engine': os.environ.get('ALVIRIDI_QUERY_ENGINE', 'pandas'),
+        'chunk_rows': int(os.environ.get('ALVIRIDI_CHUNK_ROWS') or 0),
+        'seed': args.seed,
+        'render_states': args.render_states,
+        'runs': [],
+    }
+    print(f'{"rows":>12} ' + ' '.join(f'{name:>10}' for name in STAGES) + f' {"peak MB":>9}')
+    for size in args.rows.split(','):
+        rows = synthetic.parse_size(size)
+        path = os.path.join(DATA_DIR, f'synthetic-{rows}-seed{args.seed}.csv')
+        if not os.path.exists(path):
+            print(f'generating {rows:,} rows...', file=sys.stderr, flush=True)
+            synthetic.write(path, rows, args.seed)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', path, '--render-states', str(args.render_states)],
+            capture_output=True, text=True, cwd=ROOT,
+        )
+        if child.returncode:
+            error = (f'killed by signal {-child.returncode}' if child.returncode < 0
+                     else child.stderr.strip().splitlines()[-1] if child.stderr.strip() else f'exit {child.returncode}')
+            results['runs'].append({'rows': rows, 'error': error})
+            print(f'{rows:>12,} failed: {error}')
+            continue
+        run = json.loads(child.stdout)
+        results['runs'].append(run)
+        peak = max(stage['peak_rss_mb'] for stage in run['stages'].values())
+        print(f'{rows:>12,} ' + ' '.join(f'{run["stages"][name]["seconds"]:>9.2f}s' for name in STAGES) + f' {peak:>9,.0f}')
+
+    output = args.output or os.path.join(RESULTS_DIR, f'pipeline-{(revision or "unknown")[:10]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'Wrote {output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(results, json.load(file), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Filter and aggregation latency for each query engine.
+
+    python benchmarks/query_benchmark.py [data.csv] [--engines pandas,sqlite,duckdb]
+
+Each engine answers every combination of country and fund filter (plus the
+first few single-company filters) with its aggregate and row memos disabled,
+so every state is computed from scratch. Results are checked against the
+pandas engine before timings are printed; rows the SQL engines sample are
+checked against the same Company IDs in the pandas rows.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from dataclasses import replace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alviridi.aggregate import AggregationEngine  # noqa: E402
+from alviridi.loader import load_dataset  # noqa: E402
+from alviridi.query import ENGINES, PandasEngine  # noqa: E402
+
+
+def open_uncached(path, name):
+    if name == 'pandas':
+        dataset = load_dataset(path)
+        aggregates = AggregationEngine(dataset.frame, dataset.index, dataset.aggregates.cube, max_entries=0)
+        return PandasEngine(replace(dataset, aggregates=aggregates))
+    return ENGINES[name](path, max_entries=0, row_entries=0)
+
+
+def filter_states(options, companies=3):
+    states = [
+        {'Company Name': None, 'Country': country, 'Fund': fund}
+        for country in [None] + options['Country'] for fund in [None] + options['Fund']
+    ]
+    states += [{'Company Name': company, 'Country': None, 'Fund': None} for company in options['Company Name'][:companies]]
+    return states
+
+
+def check(reference, engine, selections):
+    expected, actual = reference.compute(selections), engine.compute(selections)
+    for name, value in expected.items():
+        if isinstance(value, dict):
+            pd.testing.assert_series_equal(pd.Series(value, dtype=float), pd.Series(actual[name], dtype=float), rtol=1e-4)
+        else:
+            pd.testing.assert_frame_equal(value, actual[name], check_dtype=False, rtol=1e-4)
+    expected, actual = reference.rows(selections), engine.rows(selections)
+    if len(actual) < len(expected):
+        expected = expected.set_index('Company ID').loc[actual['Company ID']].reset_index()[expected.columns]
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True), actual.reset_index(drop=True), check_categorical=False,
+    )
+
+
+def timed(function, states):
+    timings = []
+    for selections in states:
+        started = time.perf_counter()
+        function(selections)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, max(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default='dummy_sample.csv')
+    parser.add_argument('--engines', default='pandas,' + ','.join(ENGINES))
+    args = parser.parse_args(argv)
+
+    reference = open_uncached(args.data, 'pandas')
+    states = filter_states(reference.options)
+    print(f'{len(states)} filter states, {reference.stats["rows"]:,} rows')
+    print(f'{"engine":<8} {"open ms":>9} {"rows p50/max ms":>17} {"aggregates p50/max ms":>23}')
+    for name in args.engines.split(','):
+        started = time.perf_counter()
+        engine = open_uncached(args.data, name)
+        opened = time.perf_counter() - started
+        if engine.options != reference.options:
+            raise SystemExit(f'{name}: filter options differ from pandas')
+        for selections in states:
+            check(reference, engine, selections)
+        rows, aggregates = timed(engine.rows, states), timed(engine.compute, states)
+        print(f'{name:<8} {opened * 1000:>9.1f} {rows[0]:>8.1f}/{rows[1]:<8.1f} {aggregates[0]:>11.1f}/{aggregates[1]:<11.1f}')
+
+
+if __name__ == '__main__':
+    main()
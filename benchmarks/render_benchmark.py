@@ -0,0 +1,59 @@
+"""Time a full-dashboard render serially and on the process pool.
+
+    python benchmarks/render_benchmark.py [data.csv] [--workers N]
+
+Renders every chart of every tab for the unfiltered view, once in-process
+and once fanned out across ``render_pool`` workers (after warm-up), and
+prints the wall time of each and the speedup.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alviridi import render_pool  # noqa: E402
+from alviridi.charts import ChartContext, chart_data, charts_for  # noqa: E402
+from alviridi.loader import load_dataset  # noqa: E402
+from alviridi.render import render_image  # noqa: E402
+from alviridi.tabs import TABS  # noqa: E402
+
+
+def jobs(path):
+    dataset = load_dataset(path)
+    context = ChartContext(dataset.frame, dataset.aggregates.compute({}), {}, dataset.version)
+    return [(chart.spec, chart_data(chart, context)) for title in TABS for chart in charts_for(title)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default='dummy_sample.csv')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    work = jobs(args.data)
+    render_image(*work[0])  # import and font-cache cost is not rendering cost
+
+    started = time.perf_counter()
+    for spec, data in work:
+        render_image(spec, data)
+    serial = time.perf_counter() - started
+
+    render_pool.get_executor(args.workers)
+    try:
+        started = time.perf_counter()
+        for future in [render_pool.submit(render_image, spec, data) for spec, data in work]:
+            future.result()
+        pooled = time.perf_counter() - started
+    finally:
+        render_pool.shutdown()
+
+    print(f'charts:  {len(work)}')
+    print(f'serial:  {serial:.2f}s')
+    print(f'pool:    {pooled:.2f}s ({args.workers} workers)')
+    print(f'speedup: {serial / pooled:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
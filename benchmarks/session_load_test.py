@@ -0,0 +1,151 @@
+"""Concurrent sessions against one server process: how CPU grows with the number of viewers.
+
+    python benchmarks/session_load_test.py [data.csv] [--sessions 1,2,4,8,16] [--views 1]
+
+Each simulated session is a thread doing what app.py does for a page view:
+open the query engine, select the rows, compute the aggregates, then
+fetch every chart of the first tab from the figure cache, or render it.
+All sessions start together, as when a link is shared, and each opens the
+default view and then ``--views - 1`` single-country or single-fund views,
+picked at random per session.
+
+Every session count runs in a fresh process, so each starts cold: the data
+is not loaded, the memo and figure cache are empty and the render pool has
+just started. CPU counts the server and its render workers together. A run
+with no sessions measures the pool's start-up, which is subtracted. Without
+sharing, N sessions would cost about N times one session's CPU. The
+``vs N x 1`` column shows the fraction actually used. The
+load/aggregate/chart_data/render columns count how often each stage ran,
+over all sessions.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ('load', 'aggregate', 'chart_data', 'render')
+
+
+def cpu_seconds():
+    # This process plus reaped children: the render workers, once shut down.
+    return sum(
+        usage.ru_utime + usage.ru_stime
+        for usage in (resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN))
+    )
+
+
+def views(options, session, count):
+    states = [{'Country': country} for country in options['Country']] + [{'Fund': fund} for fund in options['Fund']]
+    rng = random.Random(session)
+    return [{}] + [rng.choice(states) for _ in range(count - 1)]
+
+
+def run_sessions(path, sessions, view_count):
+    """Run ``sessions`` concurrent sessions on ``path`` in this process; returns the results dict."""
+    from alviridi import render_pool
+    from alviridi.charts import ChartContext, charts_for
+    from alviridi.figcache import FIGURES
+    from alviridi.instrument import METRICS
+    from alviridi.query import open_engine
+    from alviridi.tabs import TABS, figure_key, render_async
+
+    render_pool.get_executor()
+    METRICS.reset()
+    title = next(iter(TABS))
+    latencies = []
+    barrier = threading.Barrier(sessions + 1)
+
+    def session(number):
+        barrier.wait()
+        for i in range(view_count):
+            started = time.perf_counter()
+            engine = open_engine(path)
+            state = views(engine.options, number, view_count)[i]
+            selections = {'Company Name': None, 'Country': None, 'Fund': None, **state}
+            rows = engine.rows(selections).copy(deep=False)
+            context = ChartContext(rows, engine.compute(selections), selections, engine.version)
+            pending = []
+            for chart in charts_for(title):
+                key = figure_key(chart, context)
+                if FIGURES.get(key) is None:
+                    pending.append(render_async(chart, context, key))
+            for future in pending:
+                future.result()
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=session, args=(number,)) for number in range(sessions)]
+    for thread in threads:
+        thread.start()
+    cpu_started = cpu_seconds()
+    started = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    render_pool.shutdown()
+    stats, _ = METRICS.snapshot()
+    counts = {stage: 0 for stage in STAGES}
+    for (stage, _chart), (count, *_rest) in stats.items():
+        if stage in counts:
+            counts[stage] += count
+    latencies.sort()
+    return {
+        'sessions': sessions,
+        'page_views': len(latencies),
+        'wall_seconds': wall,
+        'cpu_seconds': cpu_seconds() - cpu_started,
+        'p50_seconds': latencies[len(latencies) // 2] if latencies else 0.0,
+        'max_seconds': latencies[-1] if latencies else 0.0,
+        'stage_counts': counts,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default=os.environ.get('ALVIRIDI_DATA', 'dummy_sample.csv'))
+    parser.add_argument('--sessions', default='1,2,4,8,16', help='comma-separated session counts (default: 1,2,4,8,16)')
+    parser.add_argument('--views', type=int, default=1, help='page views per session (default: 1)')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        json.dump(run_sessions(args.data, args.child, args.views), sys.stdout)
+        return
+
+    def run(sessions):
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), args.data, '--views', str(args.views), '--child', str(sessions)],
+            capture_output=True, text=True, check=True, cwd=os.getcwd(),
+        )
+        return json.loads(child.stdout)
+
+    if os.path.splitext(args.data)[1].lower() == '.csv':
+        from alviridi import columnar
+        arrow_path = columnar.cache_path(args.data)
+        if not columnar.is_fresh(args.data, arrow_path):
+            columnar.convert(args.data, arrow_path)
+    overhead = run(0)['cpu_seconds']
+    single = None
+    print(f'{"sessions":>8} {"wall s":>7} {"CPU s":>7} {"vs N x 1":>8} {"views/s":>8} {"p50 s":>6} {"max s":>6} '
+          + ' '.join(f'{stage:>10}' for stage in STAGES))
+    for sessions in (int(count) for count in args.sessions.split(',')):
+        result = run(sessions)
+        cpu = max(result['cpu_seconds'] - overhead, 0.0)
+        single = single or cpu / sessions
+        print(
+            f'{sessions:>8} {result["wall_seconds"]:>7.2f} {cpu:>7.2f} {cpu / (single * sessions):>8.0%} '
+            f'{result["page_views"] / result["wall_seconds"]:>8.2f} {result["p50_seconds"]:>6.2f} '
+            f'{result["max_seconds"]:>6.2f} ' + ' '.join(f'{result["stage_counts"][stage]:>10}' for stage in STAGES)
+        )
+
+
+if __name__ == '__main__':
+    main()
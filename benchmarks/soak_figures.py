@@ -0,0 +1,70 @@
+"""Render charts over and over and watch the process's resident memory.
+
+    python benchmarks/soak_figures.py [data.csv] [--reruns 10000]
+
+Each rerun renders one chart of the dashboard for one country filter,
+cycling through every chart and country, exactly as a Streamlit rerun
+would. Resident set size is sampled as it goes; once the first tenth of
+the reruns has warmed every cache, RSS should stay flat. Exits non-zero
+if it grows by more than ``--max-growth-mb`` after that point.
+"""
+import argparse
+import itertools
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alviridi.charts import ChartContext, chart_data, charts_for  # noqa: E402
+from alviridi.loader import load_dataset  # noqa: E402
+from alviridi.render import render_image  # noqa: E402
+from alviridi.tabs import TABS  # noqa: E402
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:  # not Linux: peak RSS is the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default='dummy_sample.csv')
+    parser.add_argument('--reruns', type=int, default=10000)
+    parser.add_argument('--samples', type=int, default=20, help='RSS readings to print')
+    parser.add_argument('--max-growth-mb', type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    dataset = load_dataset(args.data)
+    charts = [chart for title in TABS for chart in charts_for(title)]
+    contexts = [
+        ChartContext(dataset.aggregates.rows(selections), dataset.aggregates.compute(selections),
+                     selections, dataset.version)
+        for selections in [{}] + [{'Country': country} for country in dataset.index.options['Country']]
+    ]
+    jobs = itertools.cycle(itertools.product(contexts, charts))
+
+    every = max(1, args.reruns // args.samples)
+    baseline = None
+    started = time.perf_counter()
+    print(f'{"rerun":>8} {"rss MB":>8} {"s":>8}')
+    for rerun in range(1, args.reruns + 1):
+        context, chart = next(jobs)
+        render_image(chart.spec, chart_data(chart, context))
+        if baseline is None and rerun >= args.reruns // 10:
+            baseline = rss_mb()
+        if rerun % every == 0 or rerun == args.reruns:
+            print(f'{rerun:>8} {rss_mb():>8.1f} {time.perf_counter() - started:>8.1f}')
+
+    growth = rss_mb() - baseline
+    print(f'growth after warm-up: {growth:+.1f} MB')
+    return 1 if growth > args.max_growth_mb else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Generate synthetic portfolio exports with the dashboard's 17-column schema.
+
+    python benchmarks/synthetic.py 1m -o portfolio-1m.csv [--seed 0]
+
+Sizes accept k/m suffixes (10k, 1m, 10m). The output format follows the
+extension: .csv, .parquet or .arrow/.feather. Rows are written in chunks,
+so memory stays flat whatever the size.
+
+Values follow the ranges of dummy_sample.csv. Cardinalities grow with the
+size the way a real portfolio's would. There are always 10 funds, 30
+Global South countries and 12 themes, assigned with a Zipf-like skew so a
+few dominate. There is one company per 100 rows (10 to 50,000), and every
+row has its own Company ID. Emissions are split 1/6, 1/4 and 1/2 into
+scopes 1, 2 and 3, as in the sample. The same size and seed always produce
+the same file.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alviridi.schema import COLUMNS, DTYPES  # noqa: E402
+
+FUNDS = [
+    'Transformation Fund', 'Rise Fund', 'Orientation Fund', 'Infrastructure Fund', 'Partnership Fund',
+    'Resilience Fund', 'Catalyst Fund', 'Horizon Fund', 'Frontier Fund', 'Equity Bridge Fund',
+]
+COUNTRIES = [
+    'Indonesia', 'South Africa', 'Tanzania', 'Brazil', 'Nigeria', 'Kenya', 'Mexico', 'India', 'Bangladesh',
+    'Thailand', 'Vietnam', 'Philippines', 'Egypt', 'Ghana', 'Ethiopia', 'Colombia', 'Peru', 'Chile', 'Morocco',
+    'Pakistan', 'Sri Lanka', 'Senegal', 'Rwanda', 'Uganda', 'Zambia', 'Ecuador', 'Jordan', 'Cambodia', 'Nepal',
+    "Côte d'Ivoire",
+]
+THEMES = [
+    'Ocean Conservation', 'Carbon Capture', 'Smart Grid', 'Energy Efficiency', 'Renewable Energy',
+    'Water Management', 'Sustainable Agriculture', 'Electric Mobility', 'Green Buildings', 'Circular Economy',
+    'Clean Cooking', 'Climate Adaptation',
+]
+COMPANY_PREFIXES = [
+    'CleanPower', 'EarthRenew', 'HydroFlow', 'GreenFuture', 'WindWorks', 'SolarWind', 'CarbonZero', 'GeoTherm',
+    'EcoTech', 'BioEnergy',
+]
+
+CHUNK_ROWS = 500_000
+
+_HEX = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+
+def parse_size(text):
+    """'10k' -> 10_000, '1m' -> 1_000_000, '2500' -> 2500."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def company_names(count):
+    # The sample's ten names first, then numbered variants of them.
+    prefixes = len(COMPANY_PREFIXES)
+    return [
+        f'{COMPANY_PREFIXES[i % prefixes]} Ltd' if i < prefixes else f'{COMPANY_PREFIXES[i % prefixes]} {i // prefixes} Ltd'
+        for i in range(count)
+    ]
+
+
+def _skewed(rng, choices, size, exponent=1.1):
+    # Zipf-like popularity: the k-th choice is drawn in proportion to 1 / k**exponent.
+    weights = 1 / np.arange(1, len(choices) + 1) ** exponent
+    return rng.choice(len(choices), size=size, p=weights / weights.sum())
+
+
+def _uuids(rng, size):
+    # Random version-4 UUID strings, formatted without a Python-level loop.
+    raw = rng.integers(0, 256, size=(size, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    digits = np.empty((size, 32), dtype=np.uint8)
+    digits[:, 0::2], digits[:, 1::2] = _HEX[raw >> 4], _HEX[raw & 0x0F]
+    text = np.full((size, 36), ord('-'), dtype=np.uint8)
+    for start, end, offset in ((0, 8, 0), (8, 12, 1), (12, 16, 2), (16, 20, 3), (20, 32, 4)):
+        text[:, start + offset:end + offset] = digits[:, start:end]
+    return text.view('S36').ravel().astype(str)
+
+
+def generate_chunk(rng, size, companies):
+    """``size`` synthetic rows as a frame with the export's columns and dtypes."""
+    total_emissions = rng.integers(5_000, 28_600, size)
+    frame = pd.DataFrame({
+        'Company ID': _uuids(rng, size),
+        'Company Name': pd.Categorical.from_codes(_skewed(rng, companies, size, exponent=0.8), categories=companies),
+        'Fund': pd.Categorical.from_codes(_skewed(rng, FUNDS, size), categories=FUNDS),
+        'Investment ($M)': rng.integers(105, 971, size) * 10,
+        'Fund Size ($M)': rng.integers(600, 5_000, size),
+        'Total Capital Committed ($B)': rng.integers(150, 250, size) / 100,
+        'Fund Investments': rng.integers(3, 11, size),
+        'Global South Deals Funded': rng.integers(5, 16, size),
+        'Global South Countries Supported': rng.integers(5, 21, size),
+        'Country': pd.Categorical.from_codes(_skewed(rng, COUNTRIES, size), categories=COUNTRIES),
+        'Country Capital Catalyzed ($M)': rng.integers(50, 300, size),
+        'Theme': pd.Categorical.from_codes(_skewed(rng, THEMES, size, exponent=0.7), categories=THEMES),
+        'Theme Capital Catalyzed ($M)': rng.integers(75, 500, size),
+        'Total Emissions by Fund (tons of CO2e)': total_emissions,
+        'Scope 1 Emissions (tons of CO2e)': total_emissions // 6,
+        'Scope 2 Emissions (tons of CO2e)': total_emissions // 4,
+        'Scope 3 Emissions (tons of CO2e)': total_emissions // 2,
+    })
+    return frame[COLUMNS].astype(DTYPES)
+
+
+def write(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write ``rows`` synthetic rows to ``path``; returns ``path``."""
+    rng = np.random.default_rng(seed)
+    companies = company_names(min(max(10, rows // 100), 50_000))
+    extension = os.path.splitext(path)[1].lower()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + '.partial'
+    writer = None
+    try:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate_chunk(rng, min(chunk_rows, rows - start), companies)
+            if extension == '.csv':
+                chunk.to_csv(partial, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+                continue
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema.remove_metadata()
+                writer = (pq.ParquetWriter(partial, schema) if extension == '.parquet'
+                          else ipc.new_file(partial, schema))
+            # Every chunk has the full category lists, so their dictionaries match.
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(partial, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', help='number of rows, e.g. 10k, 1m, 10m')
+    parser.add_argument('-o', '--output', help='target file (default: synthetic-<rows>.csv)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = parse_size(args.rows)
+    path = write(args.output or f'synthetic-{args.rows}.csv', rows, args.seed)
+    print(f'Wrote {rows:,} rows to {path} ({os.path.getsize(path) / 1e6:,.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Aggregation engine results against the original dashboard's groupby (alviridi.aggregate)."""
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alviridi.aggregate import AGGREGATIONS, ROWS, Aggregation, AggregationEngine, partial_aggregate, roll_up
+from alviridi.loader import load_dataset
+from alviridi.schema import plain_categories
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dummy_sample.csv')
+EXPORT = pd.read_csv(SAMPLE)
+DATASET = load_dataset(SAMPLE)
+ROW_ENGINE = AggregationEngine(DATASET.frame, DATASET.index)
+
+# No filter, every Country x Fund combination (either may be "All"), and one
+# company (which the cube cannot answer, so both engines scan rows).
+COUNTRIES = [None] + sorted(EXPORT['Country'].unique())
+FUNDS = [None] + sorted(EXPORT['Fund'].unique())
+STATES = [
+    {'Company Name': None, 'Country': country, 'Fund': fund} for country, fund in itertools.product(COUNTRIES, FUNDS)
+] + [{'Company Name': EXPORT['Company Name'].iloc[0], 'Country': None, 'Fund': None}]
+
+
+def filtered(selections):
+    """The rows the original dashboard kept for ``selections``."""
+    data = EXPORT
+    for dimension, value in selections.items():
+        if value is not None:
+            data = data[data[dimension] == value]
+    return data
+
+
+def expected(data, spec):
+    """``spec`` computed the way the original dashboard did: groupby(...).sum()."""
+    for column in spec.notna:
+        data = data[data[column].notna()]
+    measures = list(spec.measures)
+    if not spec.keys:
+        return {measure: data[measure].sum() for measure in measures}
+    result = data.groupby(list(spec.keys))[measures].sum().reset_index()
+    for name, metric in spec.metrics:
+        ratio = result[metric.numerator] / result[metric.denominator]
+        result[name] = ratio.replace([np.inf, -np.inf], np.nan)
+    return result
+
+
+def assert_matches(got, want, spec):
+    if not spec.keys:
+        assert got.keys() == want.keys()
+        for measure, value in want.items():
+            assert got[measure] == pytest.approx(value, rel=1e-6)
+        return
+    keys = list(spec.keys)
+    got = plain_categories(got).sort_values(keys).reset_index(drop=True)
+    want = want.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want[list(got.columns)], check_dtype=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize('selections', STATES, ids=lambda state: '/'.join(str(value) for value in state.values()))
+def test_compute_matches_groupby(selections):
+    data = filtered(selections)
+    if selections['Company Name'] is None:
+        assert DATASET.aggregates.cube.covers(selections, AGGREGATIONS)
+    for engine in (DATASET.aggregates, ROW_ENGINE):
+        results = engine.compute(selections)
+        assert results.keys() == AGGREGATIONS.keys()
+        for name, spec in AGGREGATIONS.items():
+            assert_matches(results[name], expected(data, spec), spec)
+
+
+@pytest.mark.parametrize('keys', [(), ('Country',), ('Fund', 'Theme')])
+def test_roll_up_mean_count_notna(keys):
+    data = EXPORT.copy()
+    # Blank some Global South cells so notna has rows to drop.
+    data.loc[data.index[::4], 'Global South Countries Supported'] = np.nan
+    measures = ('Investment ($M)', 'Global South Deals Funded')
+    partial = partial_aggregate(data, list(keys) + ['Global South Countries Supported'], list(measures))
+    kept = data[data['Global South Countries Supported'].notna()]
+
+    for func in ('sum', 'mean', 'count'):
+        for notna, rows in (((), data), (('Global South Countries Supported',), kept)):
+            got = roll_up(partial, Aggregation(keys, measures, func=func, notna=notna))
+            if keys:
+                want = rows.groupby(list(keys))[list(measures)].agg(func).reset_index()
+                pd.testing.assert_frame_equal(
+                    got.sort_values(list(keys)).reset_index(drop=True),
+                    want.sort_values(list(keys)).reset_index(drop=True),
+                    check_dtype=False, rtol=1e-6,
+                )
+            else:
+                want = rows[list(measures)].agg(func)
+                assert got == pytest.approx(want.to_dict(), rel=1e-6)
+
+
+def test_roll_up_rejects_unknown_function():
+    partial = partial_aggregate(EXPORT, ['Country'], ['Investment ($M)'])
+    assert ROWS in partial
+    for keys in ((), ('Country',)):
+        with pytest.raises(ValueError, match='median'):
+            roll_up(partial, Aggregation(keys, ('Investment ($M)',), func='median'))
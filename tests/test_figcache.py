@@ -0,0 +1,36 @@
+"""Spilled chart images stay within the disk budget (alviridi.figcache)."""
+import os
+
+from alviridi.figcache import FigureCache
+
+
+def spilled_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def test_spill_dir_stays_within_disk_budget(tmp_path):
+    # One image fits in memory, so every put spills the one before it.
+    cache = FigureCache(max_bytes=1000, spill_dir=str(tmp_path), max_disk_bytes=3000)
+    for version in range(10):
+        cache.put(('chart', version), bytes(1000))
+
+    assert spilled_bytes(tmp_path) <= 3000
+    assert cache.stats()['disk_bytes'] == spilled_bytes(tmp_path)
+    # The latest spills survive; the oldest are gone.
+    assert cache.get(('chart', 8)) == bytes(1000)
+    assert ('chart', 0) not in cache
+
+
+def test_spill_hit_counts_as_use(tmp_path):
+    cache = FigureCache(max_bytes=1000, spill_dir=str(tmp_path), max_disk_bytes=3500)
+    for version in range(3):
+        cache.put(('chart', version), bytes(1000))
+    # Both spilled long ago, version 0 first; reading it makes it the newer.
+    os.utime(cache._spill_path(('chart', 0)), (1, 1))
+    os.utime(cache._spill_path(('chart', 1)), (2, 2))
+    assert cache.get(('chart', 0)) == bytes(1000)
+    for version in range(3, 5):
+        cache.put(('chart', version), bytes(1000))
+
+    assert ('chart', 0) in cache
+    assert ('chart', 1) not in cache
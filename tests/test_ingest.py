@@ -0,0 +1,110 @@
+"""Delta upserts (alviridi.ingest) against a fresh load of the merged export."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alviridi import ingest
+from alviridi.loader import load_dataset
+from alviridi.query import PandasEngine
+from alviridi.schema import COLUMNS, plain_categories
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dummy_sample.csv')
+BASE_ROWS = 30
+
+
+@pytest.fixture
+def export():
+    return pd.read_csv(SAMPLE, usecols=COLUMNS)
+
+
+@pytest.fixture
+def delta(export):
+    # Five rows already in the base (one moved to a new country, one to a new
+    # fund) and eleven new Company IDs, one of them in another new country.
+    rows = export.iloc[BASE_ROWS - 5:].copy()
+    rows.loc[rows.index[:5], 'Investment ($M)'] += 1000
+    rows.loc[rows.index[0], 'Country'] = 'Atlantis'
+    rows.loc[rows.index[1], 'Fund'] = 'Brand New Fund'
+    rows.loc[rows.index[-1], 'Country'] = 'Lemuria'
+    return rows
+
+
+def merged(base, delta):
+    """``base`` with ``delta`` upserted by Company ID: replaced in place, new IDs appended."""
+    result = base.set_index('Company ID')
+    updates = delta.set_index('Company ID')
+    result.loc[updates.index.intersection(result.index)] = updates.loc[updates.index.intersection(result.index)]
+    return pd.concat([result, updates[~updates.index.isin(result.index)]]).reset_index()
+
+
+def states(options):
+    return [
+        {'Company Name': None, 'Country': country, 'Fund': fund}
+        for country in [None] + options['Country'] for fund in [None] + options['Fund']
+    ]
+
+
+def sort_rows(value):
+    if isinstance(value, dict):
+        return value
+    keys = [column for column in value.columns if value[column].dtype == object]
+    return value.sort_values(keys).reset_index(drop=True) if keys else value.reset_index(drop=True)
+
+
+def assert_same_results(got, expected):
+    assert got.keys() == expected.keys()
+    for name in expected:
+        if isinstance(expected[name], dict):
+            assert got[name].keys() == expected[name].keys(), name
+            for measure, value in expected[name].items():
+                assert np.isclose(got[name][measure], value, equal_nan=True), (name, measure)
+        else:
+            pd.testing.assert_frame_equal(sort_rows(got[name]), sort_rows(expected[name]), check_dtype=False)
+
+
+def test_upsert_matches_fresh_load(tmp_path, export, delta):
+    base_path, merged_path = tmp_path / 'base.csv', tmp_path / 'merged.csv'
+    export.iloc[:BASE_ROWS].to_csv(base_path, index=False)
+    merged(export.iloc[:BASE_ROWS], delta).to_csv(merged_path, index=False)
+
+    updated = PandasEngine(ingest.upsert(load_dataset(str(base_path)), delta))
+    fresh = PandasEngine(load_dataset(str(merged_path)))
+
+    assert updated.stats['rows'] == fresh.stats['rows'] == BASE_ROWS + 11
+    assert updated.options == fresh.options
+    assert 'Atlantis' in updated.options['Country'] and 'Brand New Fund' in updated.options['Fund']
+    for selections in states(fresh.options):
+        pd.testing.assert_frame_equal(
+            plain_categories(updated.rows(selections)).reset_index(drop=True),
+            plain_categories(fresh.rows(selections)).reset_index(drop=True),
+        )
+        assert_same_results(updated.compute(selections), fresh.compute(selections))
+
+
+def test_memo_carries_over_untouched_states(tmp_path, export):
+    base_path = tmp_path / 'base.csv'
+    export.iloc[:BASE_ROWS].to_csv(base_path, index=False)
+    dataset = load_dataset(str(base_path))
+    for selections in states(dataset.index.options):
+        dataset.aggregates.compute(selections)
+
+    # One existing row changes its investment: only states that row matches go stale.
+    row = export.iloc[[0]].copy()
+    row['Investment ($M)'] += 1000
+    country, fund = row['Country'].iloc[0], row['Fund'].iloc[0]
+    updated = ingest.upsert(dataset, row)
+
+    before = updated.aggregates.stats()
+    for selections in states(updated.index.options):
+        touched = selections['Country'] in (None, country) and selections['Fund'] in (None, fund)
+        hits = updated.aggregates.stats()['hits']
+        result = updated.aggregates.compute(selections)
+        assert (updated.aggregates.stats()['hits'] > hits) is not touched, selections
+        expected = dataset.aggregates.compute(selections)
+        if touched:
+            assert result['totals']['Investment ($M)'] == expected['totals']['Investment ($M)'] + 1000
+        else:
+            assert result is expected
+    assert updated.aggregates.stats()['misses'] - before['misses'] == 4  # all, country, fund, both
@@ -0,0 +1,49 @@
+"""Loading exports with blank cells (alviridi.loader)."""
+import os
+
+import pandas as pd
+import pytest
+
+from alviridi import columnar
+from alviridi.loader import load_dataset, read_portfolio
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dummy_sample.csv')
+GLOBAL_SOUTH = 'Global South Countries Supported'
+BLANK_ROW = 3
+
+
+@pytest.fixture
+def blank_export(tmp_path):
+    # The sample with one company outside the Global South: its cell is empty.
+    export = pd.read_csv(SAMPLE, dtype=str, keep_default_na=False)
+    export.loc[BLANK_ROW, GLOBAL_SOUTH] = ''
+    path = tmp_path / 'blank.csv'
+    export.to_csv(path, index=False)
+    return str(path)
+
+
+def test_blank_cell_loads(blank_export):
+    dataset = load_dataset(blank_export)
+    expected = pd.read_csv(blank_export)
+
+    assert len(dataset.frame) == len(expected)
+    assert dataset.frame[GLOBAL_SOUTH].isna().tolist() == expected[GLOBAL_SOUTH].isna().tolist()
+    results = dataset.aggregates.compute({'Company Name': None, 'Country': None, 'Fund': None})
+    # Totals keep the row; the Global South charts leave it out.
+    assert results['totals']['Investment ($M)'] == expected['Investment ($M)'].sum()
+    global_south = expected[expected[GLOBAL_SOUTH].notna()]
+    theme_capital = global_south.groupby('Theme')['Theme Capital Catalyzed ($M)'].sum()
+    got = results['global_south_theme_capital'].set_index('Theme')['Theme Capital Catalyzed ($M)']
+    pd.testing.assert_series_equal(got.sort_index(), theme_capital.sort_index(), check_dtype=False)
+    assert results['global_south_deals']['Global South Deals Funded'].sum() == global_south['Global South Deals Funded'].sum()
+
+
+def test_blank_cell_loads_without_arrow_cache(blank_export, monkeypatch):
+    def read_only(*args, **kwargs):
+        raise PermissionError('read-only deployment')
+
+    monkeypatch.setattr(columnar, 'convert', read_only)
+    frame = read_portfolio(blank_export)
+
+    assert frame[GLOBAL_SOUTH].isna().sum() == 1
+    assert pd.isna(frame[GLOBAL_SOUTH].iloc[BLANK_ROW])